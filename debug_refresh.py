@@ -1,4 +1,4 @@
-"""Debug: simulate exactly what _refresh_wallet_data does for wallet 8."""
+"""Debug: simulate exactly what _fetch_and_save_wallet_data does for wallet 8."""
 import os, sys, traceback
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'polymarket_project.settings')
 sys.path.insert(0, os.path.dirname(__file__))
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class WalletAnalysisConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'wallet_analysis'
+
+    def ready(self):
+        from . import signals  # noqa: F401
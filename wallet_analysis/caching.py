@@ -0,0 +1,127 @@
+"""
+Cache helpers for wallet analysis API responses.
+
+Uses Django's configured cache backend (per-process LocMemCache by default).
+Invalidation is wired through model signals in signals.py; writes that send
+no signals (bulk_create, QuerySet.update) call invalidate_dashboard() directly.
+"""
+
+import hashlib
+import json
+
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Count, FloatField, Q, Sum
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Coalesce
+
+from .models import Activity, Market
+
+MARKET_TITLE_TIMEOUT = 60 * 60
+
+# Versioned so a payload shape change never reads an old entry
+DASHBOARD_KEY = 'dashboard:v1'
+DASHBOARD_TIMEOUT = 30
+
+# avg_cost_cache payload key holding the full-history activity breakdown
+ACTIVITY_BY_TYPE_KEY = '__activity_by_type__'
+ACTIVITY_TYPES = tuple(activity_type for activity_type, _ in Activity.ACTIVITY_TYPES)
+
+
+def invalidate_dashboard():
+    """Drop the cached DashboardView payload so the next request rebuilds it."""
+    cache.delete(DASHBOARD_KEY)
+
+
+def avg_cost_fingerprint(trade_count, activity_count, max_trade_id, max_activity_id):
+    """
+    Collapse the avg-cost cache signature into one signed 64-bit integer.
+
+    The signature changes whenever trades or activities are added or removed,
+    so cache validity is a single integer comparison.
+    """
+    signature = f'{trade_count}:{activity_count}:{max_trade_id}:{max_activity_id}'
+    digest = hashlib.blake2b(signature.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'big', signed=True)
+
+
+def activity_type_aggregates(date_q=Q()):
+    """Per-type count and USDC-sum aggregates for an Activity queryset."""
+    aggregates = {}
+    for activity_type in ACTIVITY_TYPES:
+        type_q = date_q & Q(activity_type=activity_type)
+        aggregates[f'{activity_type}__count'] = Count('id', filter=type_q)
+        aggregates[f'{activity_type}__total_usdc'] = Coalesce(
+            Sum('usdc_size', filter=type_q, output_field=FloatField()), 0.0
+        )
+    return aggregates
+
+
+def activity_by_type_from(row):
+    """Shape an activity_type_aggregates() result as {type: {count, total_usdc}}."""
+    return {
+        activity_type: {
+            'count': row[f'{activity_type}__count'],
+            'total_usdc': row[f'{activity_type}__total_usdc'],
+        }
+        for activity_type in ACTIVITY_TYPES
+        if row[f'{activity_type}__count']
+    }
+
+
+def json_keys_update(column, updates):
+    """
+    Expression setting top-level keys of a JSON column in place.
+
+    Only the given keys are written; the rest of the stored document is left
+    to the database. Returns None when the backend has no path update, in
+    which case the caller writes the whole value.
+    """
+    params = []
+    if connection.vendor == 'postgresql':
+        sql = f"COALESCE({column}, '{{}}'::jsonb)"
+        for key, value in updates.items():
+            sql = f'jsonb_set({sql}, %s::text[], %s::jsonb, true)'
+            params.extend([[key], json.dumps(value)])
+    elif connection.vendor == 'sqlite':
+        pairs = []
+        for key, value in updates.items():
+            pairs.append('%s, json(%s)')
+            params.extend([f'$."{key}"', json.dumps(value)])
+        sql = f"json_set(COALESCE({column}, '{{}}'), {', '.join(pairs)})"
+    else:
+        return None
+    return RawSQL(sql, params)
+
+
+def market_title_key(market_id):
+    return f'mkt:title:{market_id}'
+
+
+def market_titles(market_ids):
+    """
+    Map market ids to titles.
+
+    Cached titles are served from the cache; misses are fetched with a single
+    query and written back.
+
+    There is deliberately no functools.lru_cache in front of this. Titles
+    change through DatabaseService.get_or_create_market's update_or_create, which
+    also runs in Celery workers, and a post_save cache_clear() there cannot reach
+    the web process's lru_cache. That copy would then serve a stale title
+    with no expiry. A shared cache backend sees the signal's delete from any
+    process, and MARKET_TITLE_TIMEOUT bounds staleness otherwise.
+    """
+    keys = {market_title_key(market_id): market_id for market_id in market_ids}
+    titles = {keys[key]: title for key, title in cache.get_many(keys).items()}
+
+    missing = [market_id for market_id in market_ids if market_id not in titles]
+    if missing:
+        fetched = dict(Market.objects.filter(id__in=missing).values_list('id', 'title'))
+        cache.set_many(
+            {market_title_key(market_id): title for market_id, title in fetched.items()},
+            MARKET_TITLE_TIMEOUT,
+        )
+        titles.update(fetched)
+
+    return titles
@@ -11,7 +11,7 @@ The default convenience functions use the cost basis calculator.
 from collections import defaultdict
 from dataclasses import dataclass
 from decimal import Decimal
-from typing import Dict, Any, Optional, List, Tuple
+from typing import Dict, Any, Iterable, Optional, List, Tuple
 from datetime import date, timedelta
 import logging
 
@@ -198,8 +198,19 @@ class AvgCostBasisCalculator:
 
     def calculate(self, period: str = '1M') -> Dict[str, Any]:
         period = (period or '1M').upper()
-        if period not in self.PERIOD_WINDOWS:
-            raise ValueError(f"Unsupported period '{period}'. Use ALL/1M/1W/1D.")
+        return self.calculate_many((period,))[period]
+
+    def calculate_many(self, periods: Iterable[str] = tuple(PERIOD_WINDOWS)) -> Dict[str, Dict[str, Any]]:
+        """
+        Calculate several periods in one pass over the wallet's events.
+
+        Only the period-start snapshot and the daily PnL window depend on the
+        period, so positions and market rows are replayed once and shared.
+        """
+        periods = [(p or '1M').upper() for p in periods]
+        for period in periods:
+            if period not in self.PERIOD_WINDOWS:
+                raise ValueError(f"Unsupported period '{period}'. Use ALL/1M/1W/1D.")
 
         from wallet_analysis.models import Wallet, Trade, Activity
 
@@ -224,9 +235,9 @@ class AvgCostBasisCalculator:
         events.extend(('activity', a) for a in activities)
         events.sort(key=self._event_sort_key)
 
-        period_start_ts = self._period_start_timestamp(period)
+        period_start_ts = {p: self._period_start_timestamp(p) for p in periods}
         cumulative_now = ZERO
-        cumulative_at_period_start = ZERO if period == 'ALL' else None
+        cumulative_at_period_start = {p: ZERO if p == 'ALL' else None for p in periods}
 
         positions: Dict[str, AvgCostPositionState] = {}
         market_outcomes: Dict[int, set] = defaultdict(set)
@@ -239,7 +250,7 @@ class AvgCostBasisCalculator:
                 'pnl': ZERO,
             }
         )
-        daily_pnl = defaultdict(lambda: ZERO)
+        daily_pnl = {p: defaultdict(lambda: ZERO) for p in periods}
 
         total_buys = ZERO
         total_sells = ZERO
@@ -252,8 +263,9 @@ class AvgCostBasisCalculator:
 
         for event_type, obj in events:
             timestamp = obj.timestamp
-            if cumulative_at_period_start is None and period_start_ts is not None and timestamp >= period_start_ts:
-                cumulative_at_period_start = cumulative_now
+            for p, start_ts in period_start_ts.items():
+                if cumulative_at_period_start[p] is None and start_ts is not None and timestamp >= start_ts:
+                    cumulative_at_period_start[p] = cumulative_now
 
             realized_delta = ZERO
 
@@ -520,15 +532,12 @@ class AvgCostBasisCalculator:
 
             if realized_delta != ZERO:
                 cumulative_now += realized_delta
-                if self._is_in_period(timestamp, period_start_ts):
-                    event_date = obj.datetime.date().isoformat()
-                    daily_pnl[event_date] += realized_delta
-
-        if cumulative_at_period_start is None:
-            # Period starts after the last event -> period PnL is 0.
-            cumulative_at_period_start = cumulative_now
-
-        period_pnl = cumulative_now if period == 'ALL' else (cumulative_now - cumulative_at_period_start)
+                event_date = None
+                for p, start_ts in period_start_ts.items():
+                    if self._is_in_period(timestamp, start_ts):
+                        if event_date is None:
+                            event_date = obj.datetime.date().isoformat()
+                        daily_pnl[p][event_date] += realized_delta
 
         position_rows = []
         for pos in positions.values():
@@ -545,20 +554,30 @@ class AvgCostBasisCalculator:
 
         position_rows.sort(key=lambda p: abs(p['realized_pnl']), reverse=True)
 
-        return {
-            'period': period,
-            'total_pnl': float(cumulative_now),
-            'period_pnl': float(period_pnl),
-            'daily_pnl': self._format_daily_pnl(daily_pnl),
-            'pnl_by_market': self._sorted_market_rows(market_rows),
-            'positions': position_rows,
-            'totals': {
-                'total_buys': float(total_buys),
-                'total_sells': float(total_sells),
-                'total_redeems': float(total_redeems),
-                'total_rewards': float(total_rewards),
-            },
-        }
+        results = {}
+        for period in periods:
+            period_start = cumulative_at_period_start[period]
+            if period_start is None:
+                # Period starts after the last event -> period PnL is 0.
+                period_start = cumulative_now
+            period_pnl = cumulative_now if period == 'ALL' else (cumulative_now - period_start)
+
+            results[period] = {
+                'period': period,
+                'total_pnl': float(cumulative_now),
+                'period_pnl': float(period_pnl),
+                'trade_count': len(trades),
+                'daily_pnl': self._format_daily_pnl(daily_pnl[period]),
+                'pnl_by_market': self._sorted_market_rows(market_rows),
+                'positions': [dict(row) for row in position_rows],
+                'totals': {
+                    'total_buys': float(total_buys),
+                    'total_sells': float(total_sells),
+                    'total_redeems': float(total_redeems),
+                    'total_rewards': float(total_rewards),
+                },
+            }
+        return results
 
 
 class DjangoCashFlowProvider(ICashFlowProvider):
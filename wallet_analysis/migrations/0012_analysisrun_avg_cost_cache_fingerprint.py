@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wallet_analysis', '0011_add_neg_risk_fields'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='analysisrun',
+            name='avg_cost_cache_fingerprint',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+    ]
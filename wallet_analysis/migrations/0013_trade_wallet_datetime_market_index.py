@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wallet_analysis', '0012_analysisrun_avg_cost_cache_fingerprint'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='trade',
+            index=models.Index(fields=['wallet', 'datetime', 'market'], name='wallet_anal_wallet__9ddf81_idx'),
+        ),
+    ]
@@ -5,6 +5,8 @@ These models provide structured storage for trades, positions, and analysis resu
 """
 
 from django.db import models
+from django.db.models import OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest, Least
 from django.utils import timezone
 
 
@@ -36,6 +38,37 @@ class Wallet(models.Model):
     def __str__(self):
         return self.name or self.pseudonym or self.address[:10]
 
+    def data_datetime_bounds(self):
+        """Earliest and latest trade/activity datetime, fetched in one query."""
+        bounds = {}
+        for name, model in (('trade', Trade), ('activity', Activity)):
+            rows = model.objects.filter(wallet=OuterRef('pk')).values('datetime')
+            bounds[f'{name}_min'] = Subquery(rows.order_by('datetime')[:1])
+            bounds[f'{name}_max'] = Subquery(rows.order_by('-datetime')[:1])
+        # Coalesce both ways so a wallet with only trades or only
+        # activities still gets bounds (LEAST/GREATEST NULL handling
+        # differs between backends).
+        row = Wallet.objects.filter(pk=self.pk).values(
+            min_datetime=Least(
+                Coalesce(bounds['trade_min'], bounds['activity_min']),
+                Coalesce(bounds['activity_min'], bounds['trade_min']),
+            ),
+            max_datetime=Greatest(
+                Coalesce(bounds['trade_max'], bounds['activity_max']),
+                Coalesce(bounds['activity_max'], bounds['trade_max']),
+            ),
+        ).get()
+        return row['min_datetime'], row['max_datetime']
+
+    def data_date_bounds(self):
+        """Earliest and latest trade/activity date, or None where there is no data."""
+        start, end = self.data_datetime_bounds()
+        if hasattr(start, 'date'):
+            start = start.date()
+        if hasattr(end, 'date'):
+            end = end.date()
+        return start, end
+
 
 class Market(models.Model):
     """Polymarket markets (conditions)."""
@@ -106,6 +139,9 @@ class Trade(models.Model):
             models.Index(fields=['wallet', 'side']),
             models.Index(fields=['wallet', 'market']),
             models.Index(fields=['wallet', 'side', 'market']),
+            # Dated stats aggregates (incl. COUNT(DISTINCT market_id)) and
+            # the data date bounds read from this index.
+            models.Index(fields=['wallet', 'datetime', 'market']),
         ]
         # Unique constraint to prevent duplicate trades
         # Includes wallet and market to handle same asset traded in different contexts
@@ -306,6 +342,8 @@ class AnalysisRun(models.Model):
     avg_cost_cache_max_trade_id = models.IntegerField(null=True, blank=True)
     avg_cost_cache_max_activity_id = models.IntegerField(null=True, blank=True)
     avg_cost_cache_updated_at = models.DateTimeField(null=True, blank=True)
+    # Single-integer digest of the four counters above (see caching.avg_cost_fingerprint)
+    avg_cost_cache_fingerprint = models.BigIntegerField(null=True, blank=True)
 
     # Performance metrics
     win_rate_percent = models.DecimalField(
@@ -0,0 +1,24 @@
+"""
+JSON renderer for the wallet analysis API.
+
+orjson-backed, but with the wire format of DRF's stdlib JSONRenderer:
+serializer DecimalFields stay strings (COERCE_DECIMAL_TO_STRING is left at
+its default), bare Decimals in hand-built payloads become numbers, and UTC
+datetimes end in 'Z'.
+"""
+
+from decimal import Decimal
+
+import orjson
+from drf_orjson_renderer import renderers
+
+
+class ORJSONRenderer(renderers.ORJSONRenderer):
+    options = renderers.ORJSONRenderer.options | orjson.OPT_UTC_Z
+
+    @staticmethod
+    def default(obj):
+        # rest_framework.utils.encoders.JSONEncoder emits bare Decimals as floats
+        if isinstance(obj, Decimal):
+            return float(obj)
+        return renderers.ORJSONRenderer.default(obj)
@@ -20,6 +20,7 @@ class WalletSerializer(serializers.ModelSerializer):
             'first_seen', 'last_updated',
             'data_start_date', 'data_end_date', 'trades_count'
         ]
+        read_only_fields = fields
 
     def get_trades_count(self, obj):
         annotated = getattr(obj, 'trade_count', None)
@@ -49,6 +50,7 @@ class WalletSummarySerializer(serializers.ModelSerializer):
             'unique_markets', 'last_updated',
             'data_start_date', 'data_end_date', 'trades_count'
         ]
+        read_only_fields = fields
 
     def get_trades_count(self, obj):
         annotated = getattr(obj, 'trade_count', None)
@@ -72,6 +74,7 @@ class MarketSerializer(serializers.ModelSerializer):
             'id', 'condition_id', 'title', 'slug', 'resolved',
             'winning_outcome', 'end_date'
         ]
+        read_only_fields = fields
 
 
 class TradeSerializer(serializers.ModelSerializer):
@@ -85,6 +88,7 @@ class TradeSerializer(serializers.ModelSerializer):
             'side', 'outcome', 'price', 'size', 'total_value',
             'transaction_hash'
         ]
+        read_only_fields = fields
 
 
 class ActivitySerializer(serializers.ModelSerializer):
@@ -96,6 +100,7 @@ class ActivitySerializer(serializers.ModelSerializer):
             'id', 'wallet_address', 'activity_type', 'datetime',
             'size', 'usdc_size', 'title', 'transaction_hash'
         ]
+        read_only_fields = fields
 
 
 class CopyTradingScenarioSerializer(serializers.ModelSerializer):
@@ -106,6 +111,7 @@ class CopyTradingScenarioSerializer(serializers.ModelSerializer):
             'total_volume_usd', 'original_pnl_usd', 'estimated_copy_pnl_usd',
             'pnl_difference_usd', 'pnl_difference_percent', 'profitable'
         ]
+        read_only_fields = fields
 
 
 class AnalysisRunSerializer(serializers.ModelSerializer):
@@ -124,6 +130,7 @@ class AnalysisRunSerializer(serializers.ModelSerializer):
             'win_rate_percent', 'profit_factor', 'max_drawdown_usd',
             'copy_scenarios'
         ]
+        read_only_fields = fields
 
 
 class AnalysisRunSummarySerializer(serializers.ModelSerializer):
@@ -136,6 +143,7 @@ class AnalysisRunSummarySerializer(serializers.ModelSerializer):
             'id', 'wallet_address', 'timestamp', 'total_trades',
             'total_volume_usd', 'cash_flow_pnl'
         ]
+        read_only_fields = fields
 
 
 class WalletStatsSerializer(serializers.Serializer):
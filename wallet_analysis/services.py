@@ -75,6 +75,27 @@ class DatabaseService:
         )
         return market
 
+    def load_markets(self, titles: Dict[str, str]) -> Dict[str, Market]:
+        """
+        Map condition ids to markets, creating the missing ones.
+
+        Missing markets are inserted with one bulk_create instead of a
+        get_or_create per condition id.
+        """
+        market_cache = {m.condition_id: m for m in Market.objects.filter(condition_id__in=titles)}
+        missing = [
+            Market(condition_id=condition_id, title=title or '')
+            for condition_id, title in titles.items()
+            if condition_id not in market_cache
+        ]
+        if missing:
+            Market.objects.bulk_create(missing, ignore_conflicts=True)
+            market_cache.update(
+                (m.condition_id, m)
+                for m in Market.objects.filter(condition_id__in=[m.condition_id for m in missing])
+            )
+        return market_cache
+
     def save_trades(self, wallet: Wallet, trades: List[TradeDTO], batch_size: int = 1000) -> int:
         """
         Save trades to the database in batches to avoid locking.
@@ -87,22 +108,15 @@ class DatabaseService:
         inserted = 0
         batch = []
 
-        # Preload markets for this payload to minimize per-row lookups.
-        condition_ids = {t.condition_id for t in trades if getattr(t, 'condition_id', None)}
-        market_cache = {m.condition_id: m for m in Market.objects.filter(condition_id__in=condition_ids)}
+        # Load (or create) every market in this payload up front.
+        titles = {}
+        for t in trades:
+            if getattr(t, 'condition_id', None):
+                titles.setdefault(t.condition_id, t.title)
+        market_cache = self.load_markets(titles)
 
         for trade_dto in trades:
-            # Get or create market (cached)
-            market = None
-            if trade_dto.condition_id:
-                if trade_dto.condition_id not in market_cache:
-                    market, _ = Market.objects.get_or_create(
-                        condition_id=trade_dto.condition_id,
-                        defaults={'title': trade_dto.title or ''}
-                    )
-                    market_cache[trade_dto.condition_id] = market
-                else:
-                    market = market_cache[trade_dto.condition_id]
+            market = market_cache.get(trade_dto.condition_id) if trade_dto.condition_id else None
 
             try:
                 side_value = trade_dto.side.value if hasattr(trade_dto.side, 'value') else str(trade_dto.side)
@@ -174,15 +188,16 @@ class DatabaseService:
         """
         counts = {}
 
-        payload_condition_ids = set()
-        for items in activity_data.values():
-            if not isinstance(items, list):
+        # Load (or create) every market in this payload up front.
+        titles = {}
+        for activity_type, items in activity_data.items():
+            if activity_type == 'TRADE' or activity_type.startswith('_') or not isinstance(items, list):
                 continue
             for item in items:
                 condition_id = item.get('conditionId')
                 if condition_id:
-                    payload_condition_ids.add(condition_id)
-        market_cache = {m.condition_id: m for m in Market.objects.filter(condition_id__in=payload_condition_ids)}
+                    titles.setdefault(condition_id, item.get('title', ''))
+        market_cache = self.load_markets(titles)
 
         for activity_type, items in activity_data.items():
             # Skip non-persisted keys (trade rows are stored in Trade table, and
@@ -197,18 +212,8 @@ class DatabaseService:
 
             for item in items:
                 try:
-                    # Get or create market if condition_id exists (cached)
-                    market = None
                     condition_id = item.get('conditionId')
-                    if condition_id:
-                        if condition_id not in market_cache:
-                            market, _ = Market.objects.get_or_create(
-                                condition_id=condition_id,
-                                defaults={'title': item.get('title', '')}
-                            )
-                            market_cache[condition_id] = market
-                        else:
-                            market = market_cache[condition_id]
+                    market = market_cache.get(condition_id) if condition_id else None
 
                     ts = item.get('timestamp', 0)
                     batch.append(Activity(
@@ -396,22 +401,17 @@ class DatabaseService:
         # Clear existing current positions for this wallet
         CurrentPosition.objects.filter(wallet=wallet).delete()
 
-        market_cache = {}
+        titles = {}
+        for pos in positions:
+            if pos.get('conditionId'):
+                titles.setdefault(pos['conditionId'], pos.get('title', ''))
+        market_cache = self.load_markets(titles)
+
         objects = []
         for pos in positions:
             try:
-                # Get or create market (cached)
-                market = None
                 condition_id = pos.get('conditionId')
-                if condition_id:
-                    if condition_id not in market_cache:
-                        market, _ = Market.objects.get_or_create(
-                            condition_id=condition_id,
-                            defaults={'title': pos.get('title', '')}
-                        )
-                        market_cache[condition_id] = market
-                    else:
-                        market = market_cache[condition_id]
+                market = market_cache.get(condition_id) if condition_id else None
 
                 objects.append(CurrentPosition(
                     wallet=wallet,
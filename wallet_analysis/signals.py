@@ -0,0 +1,22 @@
+"""Signal handlers that keep the API caches in caching.py consistent."""
+
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .caching import invalidate_dashboard, market_title_key
+from .models import AnalysisRun, Market, Trade, Wallet
+
+
+@receiver([post_save, post_delete], sender=Market)
+def invalidate_market_title(sender, instance, **kwargs):
+    cache.delete(market_title_key(instance.pk))
+
+
+@receiver([post_save, post_delete], sender=Wallet)
+@receiver([post_save, post_delete], sender=Trade)
+@receiver([post_save, post_delete], sender=AnalysisRun)
+def invalidate_dashboard_on_change(sender, **kwargs):
+    # Saves through bulk_create()/update() send no signals; the fetch paths in
+    # views.py and tasks.py call invalidate_dashboard() once they finish.
+    invalidate_dashboard()
@@ -123,27 +123,17 @@ def fetch_wallet_data(self, wallet_id: int, start_date: str = None, end_date: st
         })
 
         # Update date range from actual saved data (not request params)
-        from django.db.models import Min, Max
-        trade_dates = wallet.trades.aggregate(min_date=Min('datetime'), max_date=Max('datetime'))
-        activity_dates = wallet.activities.aggregate(min_date=Min('datetime'), max_date=Max('datetime'))
-        actual_min = min(filter(None, [trade_dates['min_date'], activity_dates['min_date']]), default=None)
-        actual_max = max(filter(None, [trade_dates['max_date'], activity_dates['max_date']]), default=None)
-        if actual_min:
-            wallet.data_start_date = actual_min.date() if hasattr(actual_min, 'date') else actual_min
-        if actual_max:
-            wallet.data_end_date = actual_max.date() if hasattr(actual_max, 'date') else actual_max
+        data_start, data_end = wallet.data_date_bounds()
+        if data_start:
+            wallet.data_start_date = data_start
+        if data_end:
+            wallet.data_end_date = data_end
 
         wallet.save()
 
         # Calculate and cache P&L in background (all supported periods).
         from wallet_analysis.calculators.pnl_calculator import AvgCostBasisCalculator
-        calculator = AvgCostBasisCalculator(wallet.id)
-        avg_cost_cache = {
-            'ALL': calculator.calculate(period='ALL'),
-            '1M': calculator.calculate(period='1M'),
-            '1W': calculator.calculate(period='1W'),
-            '1D': calculator.calculate(period='1D'),
-        }
+        avg_cost_cache = AvgCostBasisCalculator(wallet.id).calculate_many()
         pnl_result = avg_cost_cache['ALL']
         wallet.subgraph_realized_pnl = pnl_result['total_pnl']
         wallet.subgraph_total_bought = pnl_result['totals'].get('total_buys', 0)
@@ -173,8 +163,15 @@ def fetch_wallet_data(self, wallet_id: int, start_date: str = None, end_date: st
                 period_end_hours=0,
             )
             from django.db.models import Count, Max
+            from wallet_analysis.caching import (
+                ACTIVITY_BY_TYPE_KEY, activity_by_type_from, activity_type_aggregates,
+                avg_cost_fingerprint,
+            )
             trade_fp = wallet.trades.aggregate(count=Count('id'), max_id=Max('id'))
-            activity_fp = wallet.activities.aggregate(count=Count('id'), max_id=Max('id'))
+            activity_fp = wallet.activities.aggregate(
+                count=Count('id'), max_id=Max('id'), **activity_type_aggregates()
+            )
+            avg_cost_cache[ACTIVITY_BY_TYPE_KEY] = activity_by_type_from(activity_fp)
 
             analysis_run.avg_cost_cache = avg_cost_cache
             analysis_run.avg_cost_cache_trade_count = trade_fp['count'] or 0
@@ -182,6 +179,12 @@ def fetch_wallet_data(self, wallet_id: int, start_date: str = None, end_date: st
             analysis_run.avg_cost_cache_max_trade_id = trade_fp['max_id']
             analysis_run.avg_cost_cache_max_activity_id = activity_fp['max_id']
             analysis_run.avg_cost_cache_updated_at = timezone.now()
+            analysis_run.avg_cost_cache_fingerprint = avg_cost_fingerprint(
+                analysis_run.avg_cost_cache_trade_count,
+                analysis_run.avg_cost_cache_activity_count,
+                analysis_run.avg_cost_cache_max_trade_id,
+                analysis_run.avg_cost_cache_max_activity_id,
+            )
             analysis_run.save(update_fields=[
                 'avg_cost_cache',
                 'avg_cost_cache_trade_count',
@@ -189,9 +192,15 @@ def fetch_wallet_data(self, wallet_id: int, start_date: str = None, end_date: st
                 'avg_cost_cache_max_trade_id',
                 'avg_cost_cache_max_activity_id',
                 'avg_cost_cache_updated_at',
+                'avg_cost_cache_fingerprint',
             ])
             db_service.save_copy_trading_scenarios(analysis_run, copy_analysis.get("scenarios", []))
 
+        # bulk_create()d trades send no signals. This only reaches the web
+        # process's dashboard cache when CACHES points at a shared backend.
+        from wallet_analysis.caching import invalidate_dashboard
+        invalidate_dashboard()
+
         logger.info(f"Completed data fetch for wallet {address}")
 
         return {
@@ -1,11 +1,22 @@
-from datetime import date, datetime
+from datetime import date, datetime, timedelta, timezone as dt_timezone
 from decimal import Decimal
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
+from django.core.cache import cache
+from django.db.models import Sum
 from django.test import TestCase
+from rest_framework.filters import BaseFilterBackend
+from rest_framework.test import APIClient
 
-from wallet_analysis.calculators.pnl_calculator import PnLCalculator
+from src.api.models import Trade as TradeDTO, TradeSide
+from wallet_analysis import views
+from wallet_analysis.caching import ACTIVITY_BY_TYPE_KEY, json_keys_update
+from wallet_analysis.calculators.pnl_calculator import AvgCostBasisCalculator, PnLCalculator
 from wallet_analysis.calculators.interfaces import ICashFlowProvider
+from wallet_analysis.models import (
+    Activity, AnalysisRun, CopyTradingScenario, Market, Trade, Wallet,
+)
+from wallet_analysis.services import DatabaseService
 
 
 # -- Test helpers --
@@ -972,3 +983,409 @@ class TestRedeemPositionInference(TestCase):
 
         self.assertEqual(len(events), 0)
         self.assertEqual(len(positions), 0)
+
+
+# -- Tests: list endpoint wire format --
+
+class TestListEndpointDecimals(TestCase):
+    """values()-backed list endpoints keep the serializers' decimal strings."""
+
+    def setUp(self):
+        self.wallet = Wallet.objects.create(address='0x' + 'a' * 40)
+        market = Market.objects.create(condition_id='0x' + '1' * 64, title='M1')
+        Trade.objects.create(
+            wallet=self.wallet, market=market, transaction_hash='0xt', asset=ASSET_YES,
+            timestamp=TS_JAN_10, datetime=datetime.utcfromtimestamp(TS_JAN_10),
+            side='BUY', outcome='Yes', price=Decimal('0.5'), size=Decimal('10'),
+            total_value=Decimal('5'),
+        )
+        Activity.objects.create(
+            wallet=self.wallet, market=market, activity_type='REDEEM', transaction_hash='0xa',
+            timestamp=TS_JAN_20, datetime=datetime.utcfromtimestamp(TS_JAN_20),
+            size=Decimal('10'), usdc_size=Decimal('10'),
+        )
+        run = AnalysisRun.objects.create(
+            wallet=self.wallet, period_start_hours_ago=24, period_end_hours_ago=0,
+            cash_flow_pnl=Decimal('3.5'),
+        )
+        CopyTradingScenario.objects.create(
+            analysis_run=run, slippage_value=1, slippage_mode='points',
+            original_pnl_usd=1, estimated_copy_pnl_usd=Decimal('1.5'),
+            pnl_difference_usd=0, pnl_difference_percent=0,
+        )
+        self.client = APIClient()
+
+    def test_trade_lists(self):
+        for url in (f'/api/wallets/{self.wallet.id}/trades/', '/api/trades/'):
+            data = self.client.get(url).json()
+            row = data['results'][0] if 'results' in data else data[0]
+            self.assertEqual(
+                (row['price'], row['size'], row['total_value']),
+                ('0.500000', '10.000000', '5.000000'), url,
+            )
+
+    def test_activity_lists(self):
+        for url in (f'/api/wallets/{self.wallet.id}/activities/', '/api/activities/'):
+            data = self.client.get(url).json()
+            row = data['results'][0] if 'results' in data else data[0]
+            self.assertEqual((row['size'], row['usdc_size']), ('10.000000', '10.000000'), url)
+
+    def test_lists_apply_filter_backends(self):
+        class FirstRowOnly(BaseFilterBackend):
+            # get_queryset() has already sliced, so a backend may only narrow further.
+            def filter_queryset(self, request, queryset, view):
+                return queryset[:1]
+
+        market = Market.objects.get()
+        Trade.objects.create(
+            wallet=self.wallet, market=market, transaction_hash='0xt2', asset=ASSET_YES,
+            timestamp=TS_JAN_20, datetime=datetime.utcfromtimestamp(TS_JAN_20),
+            side='BUY', outcome='Yes', price=Decimal('0.9'), size=Decimal('1'),
+            total_value=Decimal('0.9'),
+        )
+        Activity.objects.create(
+            wallet=self.wallet, market=market, activity_type='REDEEM', transaction_hash='0xa2',
+            timestamp=TS_JAN_10, datetime=datetime.utcfromtimestamp(TS_JAN_10),
+            size=Decimal('2'), usdc_size=Decimal('2'),
+        )
+        for viewset, url in ((views.TradeViewSet, '/api/trades/'), (views.ActivityViewSet, '/api/activities/')):
+            self.assertEqual(len(self.client.get(url).json()['results']), 2, url)
+            with patch.object(viewset, 'filter_backends', [FirstRowOnly]):
+                self.assertEqual(len(self.client.get(url).json()['results']), 1, url)
+
+    def test_analysis_lists(self):
+        run = self.client.get(f'/api/wallets/{self.wallet.id}/analyses/').json()[0]
+        self.assertEqual(run['cash_flow_pnl'], '3.50')
+        self.assertEqual(run['copy_scenarios'][0]['estimated_copy_pnl_usd'], '1.50')
+        self.assertEqual(run['copy_scenarios'][0]['slippage_value'], '1.0000')
+        recent = self.client.get('/api/dashboard/').json()['recent_analyses'][0]
+        self.assertEqual(recent['cash_flow_pnl'], '3.50')
+
+
+# -- Tests: AvgCostBasisCalculator multi-period pass --
+
+class TestAvgCostCalculateMany(TestCase):
+    """calculate_many() shares one replay across periods; checked against hand-computed PnL."""
+
+    def setUp(self):
+        self.wallet = Wallet.objects.create(address='0x' + 'b' * 40)
+        market_a = Market.objects.create(condition_id='0x' + 'a' * 64, title='A')
+        market_b = Market.objects.create(condition_id='0x' + 'b' * 64, title='B')
+        now = datetime.now(dt_timezone.utc)
+
+        def at(days_ago):
+            moment = now - timedelta(days=days_ago)
+            return {'timestamp': int(moment.timestamp()), 'datetime': moment}
+
+        # Every event is older than a day, so 1D starts after the last one.
+        trades = [
+            (market_a, 'BUY', 'Yes', '0.40', '100', 40),
+            (market_a, 'SELL', 'Yes', '0.45', '10', 35),
+            (market_b, 'BUY', 'No', '0.70', '50', 20),
+            (market_a, 'SELL', 'Yes', '0.60', '30', 10),
+            (market_b, 'BUY', 'Yes', '0.20', '50', 4),
+            (market_a, 'BUY', 'Yes', '0.50', '20', 3),
+        ]
+        for i, (market, side, outcome, price, size, days_ago) in enumerate(trades):
+            Trade.objects.create(
+                wallet=self.wallet, market=market, transaction_hash=f'0xt{i}',
+                asset=f'{market.id}-{outcome}', side=side, outcome=outcome,
+                price=Decimal(price), size=Decimal(size),
+                total_value=Decimal(price) * Decimal(size), **at(days_ago),
+            )
+        activities = [
+            (market_b, 'MERGE', '20', '20', 10),
+            (market_a, 'REWARD', '0', '2.5', 6),
+            (market_a, 'REDEEM', '90', '90', 2),
+            (market_b, 'REDEEM', '30', '0', 2),
+        ]
+        for i, (market, activity_type, size, usdc_size, days_ago) in enumerate(activities):
+            Activity.objects.create(
+                wallet=self.wallet, market=market, activity_type=activity_type,
+                transaction_hash=f'0xa{i}', size=Decimal(size),
+                usdc_size=Decimal(usdc_size), **at(days_ago),
+            )
+        self.calculator = AvgCostBasisCalculator(self.wallet.id)
+
+    def test_period_pnl_matches_hand_replay(self):
+        # Realized per event, oldest first (A = market_a Yes, B = market_b):
+        #   40d BUY A 100 @ .40          0
+        #   35d SELL A 10 @ .45         +0.5    (cumulative 0.5)
+        #   20d BUY B-No 50 @ .70        0
+        #   10d MERGE B 20 for $20      -4      (20 No at .5 - .70; no B-Yes yet)
+        #   10d SELL A 30 @ .60         +6      (cumulative 2.5)
+        #    6d REWARD A               +2.5    (cumulative 5)
+        #    4d BUY B-Yes 50 @ .20       0
+        #    3d BUY A 20 @ .50           0      (A: 80 @ .425)
+        #    2d REDEEM A 90 for $90     +46     (80 * (1 - .425))
+        #    2d REDEEM B for $0         -31     (30 No @ .70 + 50 Yes @ .20)
+        results = self.calculator.calculate_many(('ALL', '1M', '1W', '1D'))
+        expected_period_pnl = {'ALL': 20.0, '1M': 19.5, '1W': 17.5, '1D': 0.0}
+        for period, period_pnl in expected_period_pnl.items():
+            result = results[period]
+            self.assertAlmostEqual(result['period_pnl'], period_pnl, places=9, msg=period)
+            self.assertAlmostEqual(result['total_pnl'], 20.0, places=9, msg=period)
+            self.assertEqual(result['trade_count'], 6, period)
+            self.assertEqual(result['totals'], {
+                'total_buys': 95.0,
+                'total_sells': 22.5,
+                'total_redeems': 90.0,
+                'total_rewards': 2.5,
+            }, period)
+        self.assertEqual(results['1D']['daily_pnl'], [])
+
+    def test_single_period_calculate(self):
+        result = self.calculator.calculate('1w')
+        self.assertEqual(result['period'], '1W')
+        self.assertAlmostEqual(result['period_pnl'], 17.5, places=9)
+
+    def test_periods_get_independent_positions(self):
+        results = self.calculator.calculate_many(('ALL', '1M'))
+        all_rows, month_rows = results['ALL']['positions'], results['1M']['positions']
+        self.assertEqual(all_rows, month_rows)
+        self.assertIsNot(all_rows, month_rows)
+        all_rows[0]['size'] = -1.0
+        self.assertNotEqual(month_rows[0]['size'], -1.0)
+
+
+# -- Tests: in-place avg_cost_cache key updates --
+
+class TestJsonKeysUpdate(TestCase):
+    """json_keys_update() writes only the given keys of a JSONField."""
+
+    def setUp(self):
+        self.wallet = Wallet.objects.create(address='0x' + 'c' * 40)
+
+    def _run_with_cache(self, payload):
+        return AnalysisRun.objects.create(
+            wallet=self.wallet, period_start_hours_ago=0, period_end_hours_ago=0,
+            avg_cost_cache=payload,
+        )
+
+    def _update(self, run, updates):
+        expression = json_keys_update('avg_cost_cache', updates)
+        if expression is None:
+            self.skipTest('backend has no JSON path update')
+        AnalysisRun.objects.filter(pk=run.pk).update(avg_cost_cache=expression)
+        run.refresh_from_db()
+        return run.avg_cost_cache
+
+    def test_updates_keys_and_keeps_the_rest(self):
+        kept = {'period_pnl': 1.5, 'daily_pnl': [{'date': '2025-01-10', 'daily_pnl': -2.25}]}
+        run = self._run_with_cache({'ALL': kept, '1W': {'period_pnl': 0.0}})
+        updated = {
+            'period_pnl': 3.75,
+            'positions': [{'outcome': 'Yes', 'size': 10.0, 'market_id': None}],
+            'note': 'café "quoted"',
+        }
+        cache = self._update(run, {'1W': updated, ACTIVITY_BY_TYPE_KEY: {'REWARD': {'count': 1, 'total_usdc': 1.5}}})
+        self.assertEqual(cache['ALL'], kept)
+        self.assertEqual(cache['1W'], updated)
+        self.assertEqual(cache[ACTIVITY_BY_TYPE_KEY], {'REWARD': {'count': 1, 'total_usdc': 1.5}})
+
+    def test_null_column_starts_from_empty_object(self):
+        run = self._run_with_cache(None)
+        self.assertEqual(self._update(run, {'1D': {'period_pnl': 0.0}}), {'1D': {'period_pnl': 0.0}})
+
+
+class TestStatsCacheBootstrap(TestCase):
+    """Bootstrapping a second period keeps the periods already cached."""
+
+    def setUp(self):
+        self.wallet = Wallet.objects.create(address='0x' + 'd' * 40)
+        market = Market.objects.create(condition_id='0x' + 'd' * 64, title='D')
+        now = datetime.now(dt_timezone.utc)
+        for i, (side, price, days_ago) in enumerate((('BUY', '0.40', 20), ('SELL', '0.70', 3))):
+            moment = now - timedelta(days=days_ago)
+            Trade.objects.create(
+                wallet=self.wallet, market=market, transaction_hash=f'0xs{i}', asset='d-yes',
+                side=side, outcome='Yes', price=Decimal(price), size=Decimal('10'),
+                total_value=Decimal(price) * 10, timestamp=int(moment.timestamp()), datetime=moment,
+            )
+        self.client = APIClient()
+
+    def test_second_bootstrap_keeps_first_period(self):
+        url = f'/api/wallets/{self.wallet.id}/stats/'
+        self.assertEqual(self.client.get(url, {'period': 'ALL'}).status_code, 200)
+        first = AnalysisRun.objects.get(wallet=self.wallet).avg_cost_cache
+        self.assertEqual(self.client.get(url, {'period': '1W'}).status_code, 200)
+
+        cache = AnalysisRun.objects.get(wallet=self.wallet).avg_cost_cache
+        self.assertEqual(cache['ALL'], first['ALL'])
+        self.assertEqual(cache['1W'], AvgCostBasisCalculator(self.wallet.id).calculate('1W'))
+        self.assertIn(ACTIVITY_BY_TYPE_KEY, cache)
+
+
+# -- Tests: DatabaseService market loading --
+
+def make_trade_dto(condition_id, title, tx):
+    return TradeDTO(
+        proxy_wallet='0x' + 'e' * 40, side=TradeSide.BUY, asset=f'{condition_id}-yes',
+        condition_id=condition_id, size=Decimal('10'), price=Decimal('0.5'),
+        timestamp=TS_JAN_10, title=title, slug='', outcome='Yes', outcome_index=0,
+        transaction_hash=tx,
+    )
+
+
+class TestDatabaseServiceMarkets(TestCase):
+    """save_trades/save_activities create missing markets once; first title wins."""
+
+    def setUp(self):
+        self.service = DatabaseService()
+        self.wallet = Wallet.objects.create(address='0x' + 'e' * 40)
+        self.existing = Market.objects.create(condition_id='0xc1', title='Existing title')
+
+    def test_save_trades_mixes_new_existing_and_duplicate_markets(self):
+        trades = [
+            make_trade_dto('0xc1', 'Payload title', '0x1'),
+            make_trade_dto('0xc2', 'First', '0x2'),
+            make_trade_dto('0xc2', 'Second', '0x3'),
+            make_trade_dto('', 'No market', '0x4'),
+        ]
+        self.assertEqual(self.service.save_trades(self.wallet, trades), 4)
+
+        self.assertEqual(Market.objects.count(), 2)
+        self.existing.refresh_from_db()
+        self.assertEqual(self.existing.title, 'Existing title')
+        new_market = Market.objects.get(condition_id='0xc2')
+        self.assertEqual(new_market.title, 'First')
+
+        markets = dict(Trade.objects.values_list('transaction_hash', 'market_id'))
+        self.assertEqual(markets, {
+            '0x1': self.existing.id, '0x2': new_market.id, '0x3': new_market.id, '0x4': None,
+        })
+
+    def test_save_activities_reuses_markets_from_earlier_saves(self):
+        self.service.save_trades(self.wallet, [make_trade_dto('0xc2', 'From trade', '0x1')])
+        counts = self.service.save_activities(self.wallet, {
+            'REDEEM': [
+                {'conditionId': '0xc2', 'title': 'From activity', 'transactionHash': '0xa',
+                 'timestamp': TS_JAN_20, 'size': 10, 'usdcSize': 10},
+                {'conditionId': '0xc3', 'title': 'Activity first', 'transactionHash': '0xb',
+                 'timestamp': TS_JAN_20, 'size': 5, 'usdcSize': 5},
+            ],
+            'REWARD': [
+                {'conditionId': '0xc3', 'title': 'Activity second', 'transactionHash': '0xc',
+                 'timestamp': TS_JAN_20, 'size': 0, 'usdcSize': 1},
+                {'conditionId': '0xc1', 'title': 'Ignored', 'transactionHash': '0xd',
+                 'timestamp': TS_JAN_20, 'size': 0, 'usdcSize': 2},
+            ],
+            'TRADE': [{'conditionId': '0xc9', 'title': 'Not persisted'}],
+            '_errors': [],
+        })
+
+        self.assertEqual(counts, {'REDEEM': 2, 'REWARD': 2})
+        titles = dict(Market.objects.values_list('condition_id', 'title'))
+        self.assertEqual(titles, {
+            '0xc1': 'Existing title', '0xc2': 'From trade', '0xc3': 'Activity first',
+        })
+        markets = dict(Activity.objects.values_list('transaction_hash', 'market__condition_id'))
+        self.assertEqual(markets, {'0xa': '0xc2', '0xb': '0xc3', '0xc': '0xc3', '0xd': '0xc1'})
+
+
+# -- Tests: Wallet data bounds --
+
+class TestWalletDataBounds(TestCase):
+    """Wallet.data_datetime_bounds/data_date_bounds span trades and activities."""
+
+    def setUp(self):
+        self.wallet = Wallet.objects.create(address='0x' + 'f' * 40)
+        self.market = Market.objects.create(condition_id='0xf1', title='F')
+
+    def _trade(self, moment, tx):
+        Trade.objects.create(
+            wallet=self.wallet, market=self.market, transaction_hash=tx, asset='f-yes',
+            side='BUY', outcome='Yes', price=Decimal('0.5'), size=Decimal('1'),
+            total_value=Decimal('0.5'), timestamp=int(moment.timestamp()), datetime=moment,
+        )
+
+    def _activity(self, moment, tx):
+        Activity.objects.create(
+            wallet=self.wallet, market=self.market, activity_type='REWARD', transaction_hash=tx,
+            size=Decimal('0'), usdc_size=Decimal('1'), timestamp=int(moment.timestamp()), datetime=moment,
+        )
+
+    def test_empty_wallet(self):
+        self.assertEqual(self.wallet.data_datetime_bounds(), (None, None))
+        self.assertEqual(self.wallet.data_date_bounds(), (None, None))
+
+    def test_trades_only(self):
+        first = datetime(2025, 1, 10, 12, tzinfo=dt_timezone.utc)
+        last = datetime(2025, 1, 20, 8, tzinfo=dt_timezone.utc)
+        self._trade(last, '0x1')
+        self._trade(first, '0x2')
+        self.assertEqual(self.wallet.data_datetime_bounds(), (first, last))
+        self.assertEqual(self.wallet.data_date_bounds(), (date(2025, 1, 10), date(2025, 1, 20)))
+
+    def test_trades_and_activities(self):
+        # Activities bracket the trades, so each bound comes from a different table.
+        self._trade(datetime(2025, 1, 10, tzinfo=dt_timezone.utc), '0x1')
+        self._trade(datetime(2025, 1, 15, tzinfo=dt_timezone.utc), '0x2')
+        first = datetime(2024, 12, 31, 23, tzinfo=dt_timezone.utc)
+        last = datetime(2025, 2, 1, 6, tzinfo=dt_timezone.utc)
+        self._activity(first, '0xa')
+        self._activity(last, '0xb')
+        other = Wallet.objects.create(address='0x' + '9' * 40)
+        Activity.objects.create(
+            wallet=other, activity_type='REWARD', transaction_hash='0xz', size=Decimal('0'),
+            usdc_size=Decimal('1'), timestamp=0, datetime=datetime(2020, 1, 1, tzinfo=dt_timezone.utc),
+        )
+        self.assertEqual(self.wallet.data_datetime_bounds(), (first, last))
+        self.assertEqual(self.wallet.data_date_bounds(), (date(2024, 12, 31), date(2025, 2, 1)))
+
+
+# -- Tests: dashboard cache invalidation --
+
+class TestDashboardInvalidation(TestCase):
+    """Fetches write through bulk_create/update, so they drop the dashboard explicitly."""
+
+    def setUp(self):
+        cache.clear()
+        self.wallet = Wallet.objects.create(address='0x' + 'e' * 40)
+        self.client = APIClient()
+
+    def test_fetch_refreshes_cached_dashboard(self):
+        self.assertEqual(self.client.get('/api/dashboard/').json()['total_trades'], 0)
+
+        fetched = {'trades': [make_trade_dto('0xc1', 'T', '0x1')], 'raw_activity': {}, 'cash_flow': {}}
+        with patch('src.services.trade_service.TradeService.get_all_activity', return_value=fetched):
+            self.assertIsNotNone(views._fetch_and_save_wallet_data(self.wallet))
+
+        self.assertEqual(self.client.get('/api/dashboard/').json()['total_trades'], 1)
+
+
+# -- Tests: stats date parameters --
+
+class TestParseIsoDate(TestCase):
+    """parse_iso_date accepts exactly what strptime('%Y-%m-%d') did."""
+
+    def test_accepts_padded_and_unpadded_dates(self):
+        self.assertEqual(views.parse_iso_date('2024-01-05'), date(2024, 1, 5))
+        self.assertEqual(views.parse_iso_date('2024-1-5'), date(2024, 1, 5))
+
+    def test_rejects_malformed_dates(self):
+        for value in ('20240105', '2024-13-01', '2024-02-30', '24-1-5', '2024-1-5 ', ''):
+            self.assertIsNone(views.parse_iso_date(value), value)
+
+
+# -- Tests: dashboard totals --
+
+class TestDashboardTotals(TestCase):
+    """The raw totals query returns the same Decimal volume as Sum('size')."""
+
+    def test_total_volume_matches_orm_sum(self):
+        wallet = Wallet.objects.create(address='0x' + 'f' * 40)
+        for i, size in enumerate(('0.1', '0.2')):
+            Trade.objects.create(
+                wallet=wallet, transaction_hash=f'0x{i}', asset=ASSET_YES,
+                timestamp=TS_JAN_10, datetime=datetime.utcfromtimestamp(TS_JAN_10),
+                side='BUY', outcome='Yes', price=Decimal('0.5'), size=Decimal(size),
+                total_value=Decimal('0.1'),
+            )
+        volume = views.DashboardView().build_payload()['total_volume']
+        self.assertIsInstance(volume, Decimal)
+        self.assertEqual(volume, Decimal('0.3'))
+        self.assertEqual(volume, Trade.objects.aggregate(volume=Sum('size'))['volume'])
+
+    def test_total_volume_without_trades(self):
+        self.assertEqual(views.DashboardView().build_payload()['total_volume'], 0)
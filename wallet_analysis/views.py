@@ -1,12 +1,26 @@
 """Django REST Framework views for wallet analysis API."""
 
-from django.db.models import Sum, Count, Q, Min, Max
-from django.db.models.functions import TruncDate
-from rest_framework import viewsets, status
+import re
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Sum, Count, Q, F, Max, Exists, OuterRef, FloatField
+from django.db.models.functions import Cast, Coalesce, TruncDate
+from django.utils import timezone
+from rest_framework import serializers, viewsets, status
 from rest_framework.decorators import action, api_view
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from .calculators.pnl_calculator import AvgCostBasisCalculator
+from .caching import (
+    ACTIVITY_BY_TYPE_KEY, DASHBOARD_KEY, DASHBOARD_TIMEOUT,
+    activity_by_type_from, activity_type_aggregates,
+    avg_cost_fingerprint, invalidate_dashboard, json_keys_update, market_titles,
+)
 from .models import (
     Wallet, Market, Trade, Activity,
     AnalysisRun, CopyTradingScenario
@@ -14,11 +28,145 @@ from .models import (
 from .serializers import (
     WalletSerializer, WalletSummarySerializer, MarketSerializer,
     TradeSerializer, ActivitySerializer, AnalysisRunSerializer,
-    AnalysisRunSummarySerializer, WalletStatsSerializer, DashboardStatsSerializer
+    AnalysisRunSummarySerializer, CopyTradingScenarioSerializer,
+    WalletStatsSerializer, DashboardStatsSerializer
+)
+
+
+VALID_PERIODS = frozenset(('ALL', '1M', '1W', '1D'))
+# Same inputs strptime('%Y-%m-%d') accepted, including unpadded month/day.
+ISO_DATE_RE = re.compile(r'(\d{4})-(\d{1,2})-(\d{1,2})')
+
+
+def parse_iso_date(value):
+    """Parse a YYYY-MM-DD (or YYYY-M-D) string, returning None when malformed."""
+    match = ISO_DATE_RE.fullmatch(value)
+    if not match:
+        return None
+    try:
+        return date(*map(int, match.groups()))
+    except ValueError:
+        return None
+
+
+def day_start(value):
+    """Aware midnight of a date in the current timezone (what __date compares in)."""
+    return timezone.make_aware(datetime.combine(value, time.min))
+
+
+# Columns of the latest AnalysisRun read by WalletViewSet.stats (cache + metrics).
+LATEST_ANALYSIS_FIELDS = (
+    'id', 'timestamp', 'period_start_hours_ago', 'period_end_hours_ago',
+    'avg_cost_cache', 'avg_cost_cache_trade_count', 'avg_cost_cache_activity_count',
+    'avg_cost_cache_max_trade_id', 'avg_cost_cache_max_activity_id',
+    'avg_cost_cache_updated_at', 'avg_cost_cache_fingerprint',
+)
+# Decimal metrics are cast to float in SQL; keyed by their analysis_metrics name.
+ANALYSIS_METRIC_FIELDS = (
+    'win_rate_percent', 'profit_factor', 'max_drawdown_usd',
+    'cash_flow_pnl', 'buy_cost', 'sell_revenue', 'redeem_revenue',
+)
+LATEST_ANALYSIS_METRICS = {
+    f'{name}_float': Cast(name, FloatField()) for name in ANALYSIS_METRIC_FIELDS
+}
+
+# List endpoints render .values() rows directly instead of going through the
+# ModelSerializers; these mirror the serializers' field sets.
+TRADE_LIST_FIELDS = (
+    'id', 'datetime', 'side', 'outcome', 'price', 'size', 'total_value',
+    'transaction_hash',
+)
+ACTIVITY_LIST_FIELDS = (
+    'id', 'activity_type', 'datetime', 'size', 'usdc_size', 'title',
+    'transaction_hash',
+)
+ANALYSIS_RUN_LIST_FIELDS = (
+    'id', 'timestamp', 'period_start_hours_ago', 'period_end_hours_ago',
+    'total_trades', 'total_buys', 'total_sells', 'total_volume_usd',
+    'unique_markets', 'buy_cost', 'sell_revenue', 'redeem_revenue',
+    'cash_flow_pnl', 'win_rate_percent', 'profit_factor', 'max_drawdown_usd',
+)
+COPY_SCENARIO_FIELDS = (
+    'slippage_value', 'slippage_mode', 'total_trades_copied',
+    'total_volume_usd', 'original_pnl_usd', 'estimated_copy_pnl_usd',
+    'pnl_difference_usd', 'pnl_difference_percent', 'profitable',
 )
 
 
-class WalletViewSet(viewsets.ReadOnlyModelViewSet):
+def decimal_representations(serializer_class):
+    """Field name -> to_representation for a serializer's DecimalFields."""
+    return {
+        name: field.to_representation
+        for name, field in serializer_class().fields.items()
+        if isinstance(field, serializers.DecimalField)
+    }
+
+
+# The serializers render DecimalFields as fixed-place strings ("0.500000");
+# values() rows carry raw Decimals, so they are formatted the same way.
+TRADE_DECIMALS = decimal_representations(TradeSerializer)
+ACTIVITY_DECIMALS = decimal_representations(ActivitySerializer)
+ANALYSIS_RUN_DECIMALS = decimal_representations(AnalysisRunSerializer)
+COPY_SCENARIO_DECIMALS = decimal_representations(CopyTradingScenarioSerializer)
+
+
+def format_decimals(rows, representations):
+    """Render the Decimal columns of values() rows as their serializer would."""
+    rows = list(rows)
+    for row in rows:
+        for name, to_representation in representations.items():
+            value = row.get(name)
+            if value is not None:
+                row[name] = to_representation(value)
+    return rows
+
+
+def trade_rows(queryset):
+    """Project a Trade queryset to TradeSerializer-shaped dicts."""
+    return queryset.values(
+        *TRADE_LIST_FIELDS,
+        wallet_address=F('wallet__address'),
+        market_title=F('market__title'),
+    )
+
+
+def activity_rows(queryset):
+    """Project an Activity queryset to ActivitySerializer-shaped dicts."""
+    return queryset.values(*ACTIVITY_LIST_FIELDS, wallet_address=F('wallet__address'))
+
+
+def analysis_run_rows(queryset):
+    """AnalysisRunSerializer-shaped dicts, with scenarios fetched in one query."""
+    runs = list(queryset.values(*ANALYSIS_RUN_LIST_FIELDS, wallet_address=F('wallet__address')))
+    scenarios_by_run = defaultdict(list)
+    scenarios = CopyTradingScenario.objects.filter(
+        analysis_run_id__in=[run['id'] for run in runs]
+    ).values('analysis_run_id', *COPY_SCENARIO_FIELDS)
+    for scenario in format_decimals(scenarios, COPY_SCENARIO_DECIMALS):
+        scenarios_by_run[scenario.pop('analysis_run_id')].append(scenario)
+    for run in format_decimals(runs, ANALYSIS_RUN_DECIMALS):
+        run['copy_scenarios'] = scenarios_by_run[run['id']]
+    return runs
+
+
+class SharedListSerializerMixin:
+    """
+    List through one long-lived many=True serializer.
+
+    The serializers used here are stateless for reads (no request context),
+    so a class-level instance avoids re-binding fields on every request.
+    """
+    list_serializer = None
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self.list_serializer.to_representation(page))
+        return Response(self.list_serializer.to_representation(queryset))
+
+
+class WalletViewSet(SharedListSerializerMixin, viewsets.ReadOnlyModelViewSet):
     """
     API endpoints for wallets.
 
@@ -27,6 +175,7 @@ class WalletViewSet(viewsets.ReadOnlyModelViewSet):
     """
     queryset = Wallet.objects.all()
     serializer_class = WalletSerializer
+    list_serializer = WalletSummarySerializer(many=True)
 
     def get_serializer_class(self):
         if self.action == 'list':
@@ -37,31 +186,23 @@ class WalletViewSet(viewsets.ReadOnlyModelViewSet):
     def trades(self, request, pk=None):
         """GET /api/wallets/{id}/trades/ - Get wallet's trades."""
         wallet = self.get_object()
-        trades = wallet.trades.all()[:100]
-        serializer = TradeSerializer(trades, many=True)
-        return Response(serializer.data)
+        return Response(format_decimals(trade_rows(wallet.trades.all())[:100], TRADE_DECIMALS))
 
     @action(detail=True, methods=['get'])
     def activities(self, request, pk=None):
         """GET /api/wallets/{id}/activities/ - Get wallet's activities."""
         wallet = self.get_object()
-        activities = wallet.activities.all()[:100]
-        serializer = ActivitySerializer(activities, many=True)
-        return Response(serializer.data)
+        return Response(format_decimals(activity_rows(wallet.activities.all())[:100], ACTIVITY_DECIMALS))
 
     @action(detail=True, methods=['get'])
     def analyses(self, request, pk=None):
         """GET /api/wallets/{id}/analyses/ - Get wallet's analysis history."""
         wallet = self.get_object()
-        analyses = wallet.analysis_runs.all()[:20]
-        serializer = AnalysisRunSerializer(analyses, many=True)
-        return Response(serializer.data)
+        return Response(analysis_run_rows(wallet.analysis_runs.all()[:20]))
 
     @action(detail=True, methods=['get'])
     def stats(self, request, pk=None):
         """GET /api/wallets/{id}/stats/ - Get wallet statistics."""
-        from datetime import datetime
-
         wallet = self.get_object()
 
         # Parse optional date range filters for charts
@@ -72,91 +213,99 @@ class WalletViewSet(viewsets.ReadOnlyModelViewSet):
         start_date_obj = None
         end_date_obj = None
         if chart_start:
-            try:
-                start_date_obj = datetime.strptime(chart_start, '%Y-%m-%d').date()
-            except ValueError:
+            start_date_obj = parse_iso_date(chart_start)
+            if start_date_obj is None:
                 return Response(
                     {'error': 'Invalid chart_start format. Use YYYY-MM-DD'},
                     status=status.HTTP_400_BAD_REQUEST
                 )
         if chart_end:
-            try:
-                end_date_obj = datetime.strptime(chart_end, '%Y-%m-%d').date()
-            except ValueError:
+            end_date_obj = parse_iso_date(chart_end)
+            if end_date_obj is None:
                 return Response(
                     {'error': 'Invalid chart_end format. Use YYYY-MM-DD'},
                     status=status.HTTP_400_BAD_REQUEST
                 )
 
-        period = (request.query_params.get('period') or '1M').upper()
-        valid_periods = {'ALL', '1M', '1W', '1D'}
-        if period not in valid_periods:
-            return Response(
-                {'error': 'Invalid period. Use one of: ALL, 1M, 1W, 1D'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
+        period = request.query_params.get('period') or '1M'
+        if period not in VALID_PERIODS:
+            period = period.upper()
+            if period not in VALID_PERIODS:
+                return Response(
+                    {'error': 'Invalid period. Use one of: ALL, 1M, 1W, 1D'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
 
-        # Trade stats (filtered by date range if specified)
-        trades = wallet.trades.all()
+        # Date range filter for the chart stats. The cache fingerprint is
+        # always taken over the full history, so both come from the same
+        # aggregate via conditional filters: one query per relation.
+        # Half-open datetime bounds rather than __date, so the comparison
+        # stays on the indexed column instead of a per-row date cast.
+        date_q = Q()
         if start_date_obj:
-            trades = trades.filter(datetime__date__gte=start_date_obj)
+            date_q &= Q(datetime__gte=day_start(start_date_obj))
         if end_date_obj:
-            trades = trades.filter(datetime__date__lte=end_date_obj)
-
-        trade_stats = trades.aggregate(
-            total_trades=Count('id'),
-            total_buys=Count('id', filter=Q(side='BUY')),
-            total_sells=Count('id', filter=Q(side='SELL')),
-            total_volume=Sum('size'),
+            date_q &= Q(datetime__lt=day_start(end_date_obj + timedelta(days=1)))
+
+        trade_stats = wallet.trades.aggregate(
+            total_trades=Count('id', filter=date_q),
+            total_buys=Count('id', filter=date_q & Q(side='BUY')),
+            total_sells=Count('id', filter=date_q & Q(side='SELL')),
+            total_volume=Sum('size', filter=date_q),
+            unique_markets=Count('market_id', distinct=True, filter=date_q),
+            count=Count('id'),
+            max_id=Max('id'),
         )
-
-        # Unique markets (also filtered)
-        unique_markets = trades.order_by().values('market_id').distinct().count()
-
-        # Activity by type (filtered by date range if specified)
-        activities = wallet.activities.all()
-        if start_date_obj:
-            activities = activities.filter(datetime__date__gte=start_date_obj)
-        if end_date_obj:
-            activities = activities.filter(datetime__date__lte=end_date_obj)
-
-        activity_by_type = {
-            a['activity_type']: {'count': a['count'], 'total_usdc': float(a['total_usdc'] or 0)}
-            for a in activities.values('activity_type').annotate(
-                count=Count('id'),
-                total_usdc=Sum('usdc_size')
-            )
-        }
+        unique_markets = trade_stats['unique_markets']
 
         # Avg cost basis P&L is read from cached AnalysisRun payload.
         # Replay is never done on the normal request path.
-        from datetime import timedelta
-        from django.db.models import Max
-        from django.utils import timezone
-        from .calculators.pnl_calculator import AvgCostBasisCalculator
+        latest_analysis = (
+            wallet.analysis_runs.order_by('-timestamp')
+            .values(*LATEST_ANALYSIS_FIELDS, **LATEST_ANALYSIS_METRICS)
+            .first()
+        )
+        cache_payload = latest_analysis['avg_cost_cache'] if latest_analysis else None
 
-        latest_analysis_for_cache = wallet.analysis_runs.prefetch_related('copy_scenarios').first()
-        cache_payload = latest_analysis_for_cache.avg_cost_cache if latest_analysis_for_cache else None
+        # The unfiltered activity breakdown is cached alongside the periods;
+        # only compute it here when it is missing or a date range is set.
+        cached_activity_by_type = (
+            cache_payload.get(ACTIVITY_BY_TYPE_KEY)
+            if not date_q and isinstance(cache_payload, dict) else None
+        )
+        activity_stats = wallet.activities.aggregate(
+            count=Count('id'),
+            max_id=Max('id'),
+            **(activity_type_aggregates(date_q) if cached_activity_by_type is None else {}),
+        )
 
-        trade_fingerprint = wallet.trades.aggregate(count=Count('id'), max_id=Max('id'))
-        activity_fingerprint = wallet.activities.aggregate(count=Count('id'), max_id=Max('id'))
-        trade_count = trade_fingerprint['count'] or 0
-        activity_count = activity_fingerprint['count'] or 0
-        max_trade_id = trade_fingerprint['max_id']
-        max_activity_id = activity_fingerprint['max_id']
+        trade_count = trade_stats['count'] or 0
+        activity_count = activity_stats['count'] or 0
+        max_trade_id = trade_stats['max_id']
+        max_activity_id = activity_stats['max_id']
+        fingerprint = avg_cost_fingerprint(trade_count, activity_count, max_trade_id, max_activity_id)
 
+        # Valid while inside the TTL; after that, only while the data
+        # fingerprint still matches (no trades/activities added since).
         ttl_cutoff = timezone.now() - timedelta(minutes=5)
-        period_cache = cache_payload.get(period) if isinstance(cache_payload, dict) else None
-        cache_valid = (
-            latest_analysis_for_cache is not None
-            and period_cache is not None
-            and latest_analysis_for_cache.avg_cost_cache_trade_count == trade_count
-            and latest_analysis_for_cache.avg_cost_cache_activity_count == activity_count
-            and latest_analysis_for_cache.avg_cost_cache_max_trade_id == max_trade_id
-            and latest_analysis_for_cache.avg_cost_cache_max_activity_id == max_activity_id
-            and latest_analysis_for_cache.avg_cost_cache_updated_at is not None
-            and latest_analysis_for_cache.avg_cost_cache_updated_at >= ttl_cutoff
+        payload_fresh = latest_analysis is not None and (
+            (
+                latest_analysis['avg_cost_cache_updated_at'] is not None
+                and latest_analysis['avg_cost_cache_updated_at'] >= ttl_cutoff
+            )
+            or latest_analysis['avg_cost_cache_fingerprint'] == fingerprint
         )
+        period_cache = cache_payload.get(period) if isinstance(cache_payload, dict) else None
+        cache_valid = period_cache is not None and payload_fresh
+
+        if cached_activity_by_type is None:
+            activity_by_type = activity_by_type_from(activity_stats)
+        elif payload_fresh:
+            activity_by_type = cached_activity_by_type
+        else:
+            activity_by_type = activity_by_type_from(
+                wallet.activities.aggregate(**activity_type_aggregates())
+            )
 
         if cache_valid:
             pnl_result = period_cache
@@ -166,33 +315,38 @@ class WalletViewSet(viewsets.ReadOnlyModelViewSet):
         else:
             # One-time bootstrap when no cache exists yet.
             pnl_result = AvgCostBasisCalculator(wallet.id).calculate(period=period)
-            if latest_analysis_for_cache is None:
-                latest_analysis_for_cache = AnalysisRun.objects.create(
+            if latest_analysis is None:
+                new_run = AnalysisRun.objects.create(
                     wallet=wallet,
                     period_start_hours_ago=0,
                     period_end_hours_ago=0,
                     total_trades=trade_count,
                 )
-                cache_payload = {}
-            elif not isinstance(cache_payload, dict):
-                cache_payload = {}
-
-            cache_payload[period] = pnl_result
-            latest_analysis_for_cache.avg_cost_cache = cache_payload
-            latest_analysis_for_cache.avg_cost_cache_trade_count = trade_count
-            latest_analysis_for_cache.avg_cost_cache_activity_count = activity_count
-            latest_analysis_for_cache.avg_cost_cache_max_trade_id = max_trade_id
-            latest_analysis_for_cache.avg_cost_cache_max_activity_id = max_activity_id
-            latest_analysis_for_cache.avg_cost_cache_updated_at = timezone.now()
-            latest_analysis_for_cache.save(
-                update_fields=[
-                    'avg_cost_cache',
-                    'avg_cost_cache_trade_count',
-                    'avg_cost_cache_activity_count',
-                    'avg_cost_cache_max_trade_id',
-                    'avg_cost_cache_max_activity_id',
-                    'avg_cost_cache_updated_at',
-                ]
+                latest_analysis = (
+                    AnalysisRun.objects.filter(pk=new_run.pk)
+                    .values(*LATEST_ANALYSIS_FIELDS, **LATEST_ANALYSIS_METRICS)
+                    .get()
+                )
+                cache_payload = None
+
+            payload_updates = {period: pnl_result}
+            if not date_q:
+                payload_updates[ACTIVITY_BY_TYPE_KEY] = activity_by_type
+            # Set only the changed keys when a payload is already stored,
+            # instead of rewriting every cached period.
+            avg_cost_cache = payload_updates
+            if isinstance(cache_payload, dict):
+                avg_cost_cache = json_keys_update('avg_cost_cache', payload_updates)
+                if avg_cost_cache is None:
+                    avg_cost_cache = {**cache_payload, **payload_updates}
+            AnalysisRun.objects.filter(pk=latest_analysis['id']).update(
+                avg_cost_cache=avg_cost_cache,
+                avg_cost_cache_trade_count=trade_count,
+                avg_cost_cache_activity_count=activity_count,
+                avg_cost_cache_max_trade_id=max_trade_id,
+                avg_cost_cache_max_activity_id=max_activity_id,
+                avg_cost_cache_updated_at=timezone.now(),
+                avg_cost_cache_fingerprint=fingerprint,
             )
 
         # Daily P&L already comes filtered from the calculator
@@ -202,16 +356,15 @@ class WalletViewSet(viewsets.ReadOnlyModelViewSet):
         daily_volume = list(reversed(daily_pnl_data))
 
         # P&L by market from the calculator (includes redeems, merges, etc.)
-        # Enrich with market titles via single batch query
-        from .models import Market
+        # Enrich with market titles (cached; misses filled by one batch query)
         pnl_by_market = pnl_result.get('pnl_by_market', [])[:10]
         market_ids = [e.get('market_id') for e in pnl_by_market if e.get('market_id') and e.get('market_id') != 'unknown']
-        markets_by_id = Market.objects.in_bulk(market_ids) if market_ids else {}
+        titles_by_id = market_titles(market_ids) if market_ids else {}
         for entry in pnl_by_market:
             market_id = entry.get('market_id')
             if market_id and market_id != 'unknown':
-                market = markets_by_id.get(market_id)
-                entry['market__title'] = market.title if market else f'Market #{market_id}'
+                title = titles_by_id.get(market_id)
+                entry['market__title'] = title if title is not None else f'Market #{market_id}'
             else:
                 entry['market__title'] = 'Unknown'
             # Rename for frontend compatibility
@@ -229,57 +382,59 @@ class WalletViewSet(viewsets.ReadOnlyModelViewSet):
         roi_percent = (realized_pnl / total_bought * 100) if total_bought > 0 else 0
 
         # Latest analysis with copy trading scenarios
-        latest_analysis = latest_analysis_for_cache
         copy_trading_data = None
         analysis_metrics = None
 
         if latest_analysis:
+            # Already floats from the query: win rate, profit factor and
+            # drawdown stay None when not available; the totals default to 0.
             analysis_metrics = {
-                # Nullable metrics: None when not available (may legitimately not exist)
-                'win_rate_percent': float(latest_analysis.win_rate_percent) if latest_analysis.win_rate_percent is not None else None,
-                'profit_factor': float(latest_analysis.profit_factor) if latest_analysis.profit_factor is not None else None,
-                'max_drawdown_usd': float(latest_analysis.max_drawdown_usd) if latest_analysis.max_drawdown_usd is not None else None,
-                # Numeric metrics: always have a value (0 is valid)
-                'cash_flow_pnl': float(latest_analysis.cash_flow_pnl or 0),
-                'buy_cost': float(latest_analysis.buy_cost or 0),
-                'sell_revenue': float(latest_analysis.sell_revenue or 0),
-                'redeem_revenue': float(latest_analysis.redeem_revenue or 0),
-                'period_start_hours_ago': latest_analysis.period_start_hours_ago,
-                'period_end_hours_ago': latest_analysis.period_end_hours_ago,
-                'timestamp': latest_analysis.timestamp.isoformat(),
+                name: latest_analysis[f'{name}_float'] for name in ANALYSIS_METRIC_FIELDS
             }
+            analysis_metrics.update({
+                'period_start_hours_ago': latest_analysis['period_start_hours_ago'],
+                'period_end_hours_ago': latest_analysis['period_end_hours_ago'],
+                'timestamp': latest_analysis['timestamp'].isoformat(),
+            })
 
-            copy_scenarios = latest_analysis.copy_scenarios.all()
-            if copy_scenarios:
-                copy_trading_data = {
-                    'scenarios': [
-                        {
-                            'slippage_value': float(s.slippage_value),
-                            'slippage_mode': s.slippage_mode,
-                            'total_trades_copied': s.total_trades_copied,
-                            'total_volume_usd': float(s.total_volume_usd),
-                            'original_pnl_usd': float(s.original_pnl_usd),
-                            'estimated_copy_pnl_usd': float(s.estimated_copy_pnl_usd),
-                            'pnl_difference_usd': float(s.pnl_difference_usd),
-                            'pnl_difference_percent': float(s.pnl_difference_percent),
-                            'profitable': s.profitable,
-                        }
-                        for s in copy_scenarios
-                    ]
+            copy_scenarios = CopyTradingScenario.objects.filter(
+                analysis_run_id=latest_analysis['id']
+            ).values(
+                'slippage_value', 'slippage_mode', 'total_trades_copied',
+                'total_volume_usd', 'original_pnl_usd', 'estimated_copy_pnl_usd',
+                'pnl_difference_usd', 'pnl_difference_percent', 'profitable',
+            )
+            scenarios = [
+                {
+                    'slippage_value': float(s['slippage_value']),
+                    'slippage_mode': s['slippage_mode'],
+                    'total_trades_copied': s['total_trades_copied'],
+                    'total_volume_usd': float(s['total_volume_usd']),
+                    'original_pnl_usd': float(s['original_pnl_usd']),
+                    'estimated_copy_pnl_usd': float(s['estimated_copy_pnl_usd']),
+                    'pnl_difference_usd': float(s['pnl_difference_usd']),
+                    'pnl_difference_percent': float(s['pnl_difference_percent']),
+                    'profitable': s['profitable'],
                 }
+                for s in copy_scenarios
+            ]
+            if scenarios:
+                copy_trading_data = {'scenarios': scenarios}
 
         # Data completeness: check if markets with MERGE/REDEEM have corresponding BUY trades
-        merge_redeem_market_ids = set(
+        coverage = (
             wallet.activities.filter(activity_type__in=['MERGE', 'REDEEM'])
             .exclude(market_id__isnull=True)
-            .order_by().values_list('market_id', flat=True).distinct()
-        )
-        if merge_redeem_market_ids:
-            markets_with_buys = set(
-                wallet.trades.filter(market_id__in=merge_redeem_market_ids, side='BUY')
-                .order_by().values_list('market_id', flat=True).distinct()
+            .annotate(has_buy=Exists(Trade.objects.filter(
+                wallet_id=wallet.pk, market_id=OuterRef('market_id'), side='BUY'
+            )))
+            .aggregate(
+                total=Count('market_id', distinct=True),
+                covered=Count('market_id', distinct=True, filter=Q(has_buy=True)),
             )
-            data_coverage_pct = round(len(markets_with_buys) / len(merge_redeem_market_ids) * 100, 1)
+        )
+        if coverage['total']:
+            data_coverage_pct = round(coverage['covered'] / coverage['total'] * 100, 1)
         else:
             data_coverage_pct = 100.0
 
@@ -305,7 +460,7 @@ class WalletViewSet(viewsets.ReadOnlyModelViewSet):
             'unique_markets': unique_markets,
             'activity_by_type': activity_by_type,
             'daily_pnl': daily_volume,
-            'pnl_by_market': pnl_result.get('pnl_by_market', [])[:10],
+            'pnl_by_market': pnl_by_market,
             'positions': pnl_result.get('positions', [])[:20],
             'period_pnl': {
                 'period': period,
@@ -324,18 +479,17 @@ class WalletViewSet(viewsets.ReadOnlyModelViewSet):
         return Response(data)
 
 
-class MarketViewSet(viewsets.ReadOnlyModelViewSet):
+class MarketViewSet(SharedListSerializerMixin, viewsets.ReadOnlyModelViewSet):
     """API endpoints for markets."""
     queryset = Market.objects.all()
     serializer_class = MarketSerializer
+    list_serializer = MarketSerializer(many=True)
 
     @action(detail=True, methods=['get'])
     def trades(self, request, pk=None):
         """GET /api/markets/{id}/trades/ - Get market's trades."""
         market = self.get_object()
-        trades = market.trades.all()[:100]
-        serializer = TradeSerializer(trades, many=True)
-        return Response(serializer.data)
+        return Response(format_decimals(trade_rows(market.trades.all())[:100], TRADE_DECIMALS))
 
 
 class TradeViewSet(viewsets.ReadOnlyModelViewSet):
@@ -358,6 +512,13 @@ class TradeViewSet(viewsets.ReadOnlyModelViewSet):
 
         return queryset[:500]
 
+    def list(self, request, *args, **kwargs):
+        rows = trade_rows(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(format_decimals(page, TRADE_DECIMALS))
+        return Response(format_decimals(rows, TRADE_DECIMALS))
+
 
 class ActivityViewSet(viewsets.ReadOnlyModelViewSet):
     """API endpoints for activities."""
@@ -379,11 +540,19 @@ class ActivityViewSet(viewsets.ReadOnlyModelViewSet):
 
         return queryset[:500]
 
+    def list(self, request, *args, **kwargs):
+        rows = activity_rows(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(format_decimals(page, ACTIVITY_DECIMALS))
+        return Response(format_decimals(rows, ACTIVITY_DECIMALS))
 
-class AnalysisRunViewSet(viewsets.ReadOnlyModelViewSet):
+
+class AnalysisRunViewSet(SharedListSerializerMixin, viewsets.ReadOnlyModelViewSet):
     """API endpoints for analysis runs."""
     queryset = AnalysisRun.objects.select_related('wallet').prefetch_related('copy_scenarios').all()
     serializer_class = AnalysisRunSerializer
+    list_serializer = AnalysisRunSummarySerializer(many=True)
 
     def get_serializer_class(self):
         if self.action == 'list':
@@ -391,44 +560,71 @@ class AnalysisRunViewSet(viewsets.ReadOnlyModelViewSet):
         return AnalysisRunSerializer
 
 
+DASHBOARD_TOTALS_SQL = (
+    f'SELECT (SELECT COUNT(*) FROM {Wallet._meta.db_table}),'
+    f' (SELECT COUNT(*) FROM {Trade._meta.db_table}),'
+    f' (SELECT SUM(size) FROM {Trade._meta.db_table}),'
+    f' (SELECT COUNT(*) FROM {AnalysisRun._meta.db_table})'
+)
+# A raw SUM(size) is a float on SQLite and a Decimal on Postgres; the payload
+# always carries the Decimal, at size's places, that Sum('size') returned.
+TRADE_SIZE_QUANTUM = Decimal(1).scaleb(-Trade._meta.get_field('size').decimal_places)
+
+
 class DashboardView(APIView):
     """
     GET /api/dashboard/ - Dashboard statistics.
     """
 
     def get(self, request):
-        # Overall stats
-        total_wallets = Wallet.objects.count()
-        total_trades = Trade.objects.count()
-        total_volume = Trade.objects.aggregate(total=Sum('size'))['total'] or 0
-        total_analyses = AnalysisRun.objects.count()
+        return Response(cache.get_or_set(DASHBOARD_KEY, self.build_payload, DASHBOARD_TIMEOUT))
+
+    def build_payload(self):
+        # Overall stats (one round-trip)
+        with connection.cursor() as cursor:
+            cursor.execute(DASHBOARD_TOTALS_SQL)
+            total_wallets, total_trades, total_volume, total_analyses = cursor.fetchone()
+        if total_volume is None:
+            total_volume = 0
+        else:
+            total_volume = Decimal(str(total_volume)).quantize(TRADE_SIZE_QUANTUM)
 
         # Top wallets by trades count
-        top_wallets = Wallet.objects.annotate(
-            trade_count=Count('trades'),
-            unique_markets=Count('trades__market', distinct=True),
-        ).order_by('-trade_count')[:5]
+        top_wallets = list(
+            Wallet.objects.annotate(
+                trades_count=Count('trades'),
+                unique_markets=Count('trades__market', distinct=True),
+                realized_pnl=Coalesce(Cast('subgraph_realized_pnl', FloatField()), 0.0),
+            ).order_by('-trades_count').values(
+                'id', 'address', 'name', 'realized_pnl', 'unique_markets',
+                'last_updated', 'data_start_date', 'data_end_date', 'trades_count',
+            )[:5]
+        )
 
         # Recent analyses
-        recent_analyses = AnalysisRun.objects.select_related('wallet').order_by('-timestamp')[:10]
+        recent_analyses = format_decimals(
+            AnalysisRun.objects.order_by('-timestamp').values(
+                'id', 'timestamp', 'total_trades', 'total_volume_usd', 'cash_flow_pnl',
+                wallet_address=F('wallet__address'),
+            )[:10],
+            ANALYSIS_RUN_DECIMALS,
+        )
 
         data = {
             'total_wallets': total_wallets,
             'total_trades': total_trades,
             'total_volume': total_volume,
             'total_analyses': total_analyses,
-            'top_wallets': WalletSummarySerializer(top_wallets, many=True).data,
-            'recent_analyses': AnalysisRunSummarySerializer(recent_analyses, many=True).data,
+            'top_wallets': top_wallets,
+            'recent_analyses': recent_analyses,
         }
 
-        return Response(data)
+        return data
 
 
 def _bg_fetch_wallet(task_id, wallet_id, start_date=None, end_date=None):
     """Background task: fetch wallet data (runs in a daemon thread)."""
     import django
-    from datetime import datetime, timedelta
-    from django.db.models import Min, Max, Count
     from wallet_analysis.models import Wallet
     from wallet_analysis.services import DatabaseService
     from wallet_analysis.background import update_progress
@@ -448,18 +644,18 @@ def _bg_fetch_wallet(task_id, wallet_id, start_date=None, end_date=None):
     client = PolymarketClient()
     trade_service = TradeService(client)
 
-    now = datetime.now()
+    now_ts = datetime.now().timestamp()
     if end_date:
         end_dt = datetime.strptime(end_date, '%Y-%m-%d') if isinstance(end_date, str) else datetime.combine(end_date, datetime.max.time())
         before_timestamp = int(datetime.combine(end_dt.date(), datetime.max.time()).timestamp())
     else:
-        before_timestamp = int(now.timestamp())
+        before_timestamp = int(now_ts)
 
     if start_date:
         start_dt = datetime.strptime(start_date, '%Y-%m-%d') if isinstance(start_date, str) else datetime.combine(start_date, datetime.min.time())
         after_timestamp = int(datetime.combine(start_dt.date(), datetime.min.time()).timestamp())
     else:
-        after_timestamp = int(now.timestamp() - (30 * 24 * 3600))
+        after_timestamp = int(now_ts - (30 * 24 * 3600))
 
     # Fetch
     update_progress(task_id, 10, 'fetching_activity')
@@ -475,30 +671,37 @@ def _bg_fetch_wallet(task_id, wallet_id, start_date=None, end_date=None):
     if raw_activity:
         db_service.save_activities(wallet, raw_activity)
 
+    # The raw API payload (every activity dict, TRADE rows included) is only
+    # needed for saving; release it before the PnL replay loads the wallet.
+    # Plain dicts and lists hold no cycles, so dropping the names frees them.
+    del activity_result, raw_activity
+
     # Update date range
     update_progress(task_id, 70, 'updating_wallet')
-    trade_dates = wallet.trades.aggregate(min_date=Min('datetime'), max_date=Max('datetime'))
-    activity_dates = wallet.activities.aggregate(min_date=Min('datetime'), max_date=Max('datetime'))
-    actual_min = min(filter(None, [trade_dates['min_date'], activity_dates['min_date']]), default=None)
-    actual_max = max(filter(None, [trade_dates['max_date'], activity_dates['max_date']]), default=None)
-    if actual_min:
-        wallet.data_start_date = actual_min.date() if hasattr(actual_min, 'date') else actual_min
-    if actual_max:
-        wallet.data_end_date = actual_max.date() if hasattr(actual_max, 'date') else actual_max
-    wallet.save()
+    data_start, data_end = wallet.data_date_bounds()
+    if data_start:
+        wallet.data_start_date = data_start
+    if data_end:
+        wallet.data_end_date = data_end
+    wallet.last_updated = timezone.now()
+    Wallet.objects.filter(pk=wallet.pk).update(
+        data_start_date=wallet.data_start_date,
+        data_end_date=wallet.data_end_date,
+        last_updated=wallet.last_updated,
+    )
 
     # PnL — cache all periods
     update_progress(task_id, 80, 'calculating_pnl')
-    from wallet_analysis.calculators.pnl_calculator import AvgCostBasisCalculator
     avg_cost_cache = {}
     try:
-        calculator = AvgCostBasisCalculator(wallet.id)
-        for p in ('ALL', '1M', '1W', '1D'):
-            avg_cost_cache[p] = calculator.calculate(period=p)
+        avg_cost_cache.update(AvgCostBasisCalculator(wallet.id).calculate_many())
         pnl_result = avg_cost_cache['ALL']
         wallet.subgraph_realized_pnl = pnl_result['total_pnl']
         wallet.subgraph_total_bought = pnl_result['totals'].get('total_buys', 0)
-        wallet.save(update_fields=['subgraph_realized_pnl', 'subgraph_total_bought'])
+        Wallet.objects.filter(pk=wallet.pk).update(
+            subgraph_realized_pnl=wallet.subgraph_realized_pnl,
+            subgraph_total_bought=wallet.subgraph_total_bought,
+        )
     except Exception as e:
         print(f"PnL calc error (non-fatal): {e}")
 
@@ -521,6 +724,9 @@ def _bg_fetch_wallet(task_id, wallet_id, start_date=None, end_date=None):
             period_end_hours=0,
         )
 
+    # Trades were bulk-inserted and the wallet updated in place: no signals.
+    invalidate_dashboard()
+
     return {
         'status': 'success',
         'wallet_id': wallet_id,
@@ -666,7 +872,6 @@ def extend_wallet_range(request, pk):
     Body: {"direction": "backward" | "forward" | "all", "days": 30}
     Or: {"start_date": "2024-01-01", "end_date": "2024-01-31"}
     """
-    from datetime import datetime, timedelta
     from wallet_analysis.background import run_in_background
 
     try:
@@ -674,6 +879,8 @@ def extend_wallet_range(request, pk):
     except Wallet.DoesNotExist:
         return Response({'error': 'Wallet not found'}, status=status.HTTP_404_NOT_FOUND)
 
+    today = datetime.now().date()
+
     direction = request.data.get('direction')
     days = request.data.get('days', 30)
     start_date_str = request.data.get('start_date')
@@ -687,16 +894,16 @@ def extend_wallet_range(request, pk):
         except ValueError:
             return Response({'error': 'Invalid date format. Use YYYY-MM-DD'}, status=status.HTTP_400_BAD_REQUEST)
     elif direction == 'backward':
-        current_start = wallet.data_start_date or datetime.now().date()
+        current_start = wallet.data_start_date or today
         end_date = current_start - timedelta(days=1)
         start_date = end_date - timedelta(days=days)
     elif direction == 'forward':
-        current_end = wallet.data_end_date or datetime.now().date()
+        current_end = wallet.data_end_date or today
         start_date = current_end + timedelta(days=1)
-        end_date = min(start_date + timedelta(days=days), datetime.now().date())
+        end_date = min(start_date + timedelta(days=days), today)
     elif direction == 'all':
         start_date = datetime(2020, 1, 1).date()
-        end_date = datetime.now().date()
+        end_date = today
     else:
         return Response({'error': 'Provide direction (backward/forward/all) or start_date/end_date'}, status=status.HTTP_400_BAD_REQUEST)
 
@@ -715,46 +922,39 @@ def extend_wallet_range(request, pk):
     })
 
 
-def _refresh_wallet_data(wallet, timeout_minutes=5, start_date=None, end_date=None):
+def _fetch_and_save_wallet_data(wallet, start_date=None, end_date=None):
     """
-    Internal function to refresh wallet data with timeout.
+    Fetch wallet activity, save it and refresh the wallet's cached P&L.
 
-    Args:
-        wallet: Wallet instance
-        timeout_minutes: Max time for operation
-        start_date: Optional start date (datetime.date) - if None, uses 30 days ago
-        end_date: Optional end date (datetime.date) - if None, uses today
+    Returns (trades, cash_flow, stored trade count) for the analytics step,
+    or None on failure.
     """
-    from datetime import datetime, timedelta
 
     from src.api.polymarket_client import PolymarketClient
     from src.services.trade_service import TradeService
-    from src.services.analytics_service import AnalyticsService
-    from src.services.copy_trading_analyzer import CopyTradingAnalyzer
     from wallet_analysis.services import DatabaseService
 
     db_service = DatabaseService()
     client = PolymarketClient()
     trade_service = TradeService(client)
-    analytics_service = AnalyticsService()
-    copy_trading_analyzer = CopyTradingAnalyzer(use_percentage=False)  # Use points mode
 
     address = wallet.address
 
     # Calculate time range
     now = datetime.now()
+    now_ts = now.timestamp()
     if end_date:
         end_dt = datetime.combine(end_date, datetime.max.time())
         before_timestamp = int(end_dt.timestamp())
     else:
-        before_timestamp = int(now.timestamp())
+        before_timestamp = int(now_ts)
         end_date = now.date()
 
     if start_date:
         start_dt = datetime.combine(start_date, datetime.min.time())
         after_timestamp = int(start_dt.timestamp())
     else:
-        after_timestamp = int(now.timestamp() - (720 * 60 * 60))  # 30 days
+        after_timestamp = int(now_ts - (720 * 60 * 60))  # 30 days
         start_date = (now - timedelta(days=30)).date()
 
     try:
@@ -781,49 +981,79 @@ def _refresh_wallet_data(wallet, timeout_minutes=5, start_date=None, end_date=No
             db_service.save_activities(wallet, raw_activity)
 
         # Update date range from actual saved data (not request params)
-        trade_dates = wallet.trades.aggregate(min_date=Min('datetime'), max_date=Max('datetime'))
-        activity_dates = wallet.activities.aggregate(min_date=Min('datetime'), max_date=Max('datetime'))
-        actual_min = min(filter(None, [trade_dates['min_date'], activity_dates['min_date']]), default=None)
-        actual_max = max(filter(None, [trade_dates['max_date'], activity_dates['max_date']]), default=None)
-        if actual_min:
-            wallet.data_start_date = actual_min.date() if hasattr(actual_min, 'date') else actual_min
-        if actual_max:
-            wallet.data_end_date = actual_max.date() if hasattr(actual_max, 'date') else actual_max
-
-        wallet.save()
+        data_start, data_end = wallet.data_date_bounds()
+        if data_start:
+            wallet.data_start_date = data_start
+        if data_end:
+            wallet.data_end_date = data_end
 
         # Keep wallet-level cached P&L consistent with the avg cost calculator.
-        from wallet_analysis.calculators.pnl_calculator import AvgCostBasisCalculator
         pnl_result = AvgCostBasisCalculator(wallet.id).calculate(period='ALL')
         wallet.subgraph_realized_pnl = pnl_result['total_pnl']
         wallet.subgraph_total_bought = pnl_result['totals'].get('total_buys', 0)
-        wallet.save(update_fields=['subgraph_realized_pnl', 'subgraph_total_bought'])
-
-        # Run analytics if we have trades
-        if trades:
-            analytics = analytics_service.analyze(trades)
-            resolutions = analytics.pop("_resolutions", {})
-
-            # Copy trading simulation
-            copy_analysis = copy_trading_analyzer.analyze(trades, resolutions, cash_flow)
-
-            # Save analysis run
-            db_service.save_market_resolutions(resolutions)
-            analysis_run = db_service.save_analysis_run(
-                wallet=wallet,
-                summary=analytics.get("summary", {}),
-                cash_flow=cash_flow,
-                performance=analytics.get("performance", {}),
-                period_start_hours=720,
-                period_end_hours=0,
-            )
-            db_service.save_copy_trading_scenarios(analysis_run, copy_analysis.get("scenarios", []))
+        wallet.last_updated = timezone.now()
+        Wallet.objects.filter(pk=wallet.pk).update(
+            data_start_date=wallet.data_start_date,
+            data_end_date=wallet.data_end_date,
+            subgraph_realized_pnl=wallet.subgraph_realized_pnl,
+            subgraph_total_bought=wallet.subgraph_total_bought,
+            last_updated=wallet.last_updated,
+        )
+        # Trades were bulk-inserted and the wallet updated in place: no signals.
+        invalidate_dashboard()
 
-        return True
+        return trades, cash_flow, pnl_result['trade_count']
 
     except Exception as e:
         print(f"Error refreshing wallet {address}: {e}")
-        return False
+        return None
+
+
+def _run_wallet_analytics(wallet, trades, cash_flow):
+    """Run analytics and the copy-trading simulation, then save the analysis run."""
+    from src.services.analytics_service import AnalyticsService
+    from src.services.copy_trading_analyzer import CopyTradingAnalyzer
+    from wallet_analysis.services import DatabaseService
+
+    db_service = DatabaseService()
+    analytics_service = AnalyticsService()
+    copy_trading_analyzer = CopyTradingAnalyzer(use_percentage=False)  # Use points mode
+
+    analytics = analytics_service.analyze(trades)
+    resolutions = analytics.pop("_resolutions", {})
+
+    # Copy trading simulation
+    copy_analysis = copy_trading_analyzer.analyze(trades, resolutions, cash_flow)
+
+    # Save analysis run
+    db_service.save_market_resolutions(resolutions)
+    analysis_run = db_service.save_analysis_run(
+        wallet=wallet,
+        summary=analytics.get("summary", {}),
+        cash_flow=cash_flow,
+        performance=analytics.get("performance", {}),
+        period_start_hours=720,
+        period_end_hours=0,
+    )
+    db_service.save_copy_trading_scenarios(analysis_run, copy_analysis.get("scenarios", []))
+
+
+def _bg_run_wallet_analytics(task_id, wallet_id, trades, cash_flow):
+    """Background task: analytics for already-saved wallet data (daemon thread)."""
+    import django
+    from wallet_analysis.background import update_progress
+
+    # Close old DB connections for thread safety
+    django.db.connections.close_all()
+
+    wallet = Wallet.objects.get(pk=wallet_id)
+    update_progress(task_id, 50, 'running_analytics')
+    _run_wallet_analytics(wallet, trades, cash_flow)
+    return {
+        'status': 'success',
+        'wallet_id': wallet_id,
+        'trades_count': len(trades),
+    }
 
 
 @api_view(['POST'])
@@ -835,21 +1065,28 @@ def analyze_wallet(request):
     if not address:
         return Response({'error': 'address is required'}, status=status.HTTP_400_BAD_REQUEST)
 
+    from wallet_analysis.background import run_in_background
     from wallet_analysis.services import DatabaseService
     db_service = DatabaseService()
 
     wallet = db_service.get_or_create_wallet(address)
 
     try:
-        success = _refresh_wallet_data(wallet, timeout_minutes=5)
-        if success:
-            wallet.refresh_from_db()
-            return Response({
-                'wallet_id': wallet.id,
-                'address': wallet.address,
-                'trades_count': wallet.trades.count(),
-            })
-        else:
+        fetched = _fetch_and_save_wallet_data(wallet)
+        if fetched is None:
             return Response({'error': 'Failed to fetch wallet data'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        # Analytics and the copy-trading simulation run off the request path.
+        trades, cash_flow, trades_count = fetched
+        analytics_task_id = None
+        if trades:
+            analytics_task_id = run_in_background(_bg_run_wallet_analytics, wallet.id, trades, cash_flow)
+
+        return Response({
+            'wallet_id': wallet.id,
+            'address': wallet.address,
+            'trades_count': trades_count,
+            'analytics_task_id': analytics_task_id,
+        })
     except Exception as e:
         return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
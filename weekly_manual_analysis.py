@@ -6,11 +6,13 @@ Date context: Feb 16, 2026.
 """
 
 import os
+from bisect import bisect_left, bisect_right
 from collections import defaultdict
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from decimal import Decimal
-from itertools import combinations
+from itertools import accumulate, combinations
+from types import SimpleNamespace
 from typing import Dict, List, Optional, Set, Tuple
 
 import django
@@ -26,7 +28,7 @@ except ModuleNotFoundError as exc:
     else:
         raise
 
-from wallet_analysis.models import Activity, Trade, Wallet  # noqa: E402
+from wallet_analysis.models import Activity, Market, Trade, Wallet  # noqa: E402
 
 
 WALLET_ID = 7
@@ -41,11 +43,27 @@ CUTOFF_7D_TS = int(datetime(2026, 2, 9, 0, 0, 0, tzinfo=timezone.utc).timestamp(
 CUTOFF_10D_TS = int(datetime(2026, 2, 6, 0, 0, 0, tzinfo=timezone.utc).timestamp())
 
 
-def D(x) -> Decimal:
-    return Decimal(str(x))
+# Keyed on (type, value): 1, 1.0 and Decimal("1") hash alike but stringify differently.
+_D_CACHE: Dict[Tuple[type, object], Decimal] = {}
+_D_CACHE_MAX = 4096
 
 
-@dataclass
+def D(x) -> Decimal:
+    # DecimalField values are already Decimal; skip the str() round-trip.
+    if isinstance(x, Decimal):
+        return x
+    key = (type(x), x)
+    try:
+        return _D_CACHE[key]
+    except KeyError:
+        pass
+    value = Decimal(str(x))
+    if len(_D_CACHE) < _D_CACHE_MAX:
+        _D_CACHE[key] = value
+    return value
+
+
+@dataclass(slots=True)
 class Pos:
     shares: Decimal = ZERO
     avg_cost: Decimal = ZERO
@@ -77,7 +95,7 @@ class Pos:
         return pnl
 
 
-@dataclass
+@dataclass(slots=True)
 class EventRow:
     idx: int
     ts: int
@@ -98,9 +116,25 @@ class EventRow:
     raw_amount: Decimal = ZERO
 
 
+class PositionBook(dict):
+    """(market_id, outcome) -> Pos, with per-market keys in insertion order."""
+
+    def __init__(self):
+        super().__init__()
+        self.by_market: Dict[int, List[Tuple[int, str]]] = defaultdict(list)
+
+    def __missing__(self, key: Tuple[int, str]) -> Pos:
+        pos = self[key] = Pos()
+        self.by_market[key[0]].append(key)
+        return pos
+
+    def market_items(self, market_id: int) -> List[Tuple[Tuple[int, str], Pos]]:
+        return [(k, self[k]) for k in self.by_market.get(market_id, ())]
+
+
 @dataclass
 class ReplayState:
-    positions: Dict[Tuple[int, str], Pos] = field(default_factory=lambda: defaultdict(Pos))
+    positions: PositionBook = field(default_factory=PositionBook)
     market_outcomes: Dict[int, Set[str]] = field(default_factory=lambda: defaultdict(set))
     market_resolution: Dict[int, Tuple[int, str]] = field(default_factory=dict)
     last_wallet_trade_price: Dict[Tuple[int, str], Decimal] = field(default_factory=dict)
@@ -125,46 +159,60 @@ def sort_key(event_type, obj):
 
 
 def market_tag_for(obj) -> str:
-    if getattr(obj, "market", None):
-        m = obj.market
+    return obj.market_tag
+
+
+def load_market_tags(market_ids: Set[int]) -> Dict[int, str]:
+    """Display tag per market: slug, else condition id prefix."""
+    tags = {}
+    for m in Market.objects.filter(id__in=market_ids).only("id", "slug", "condition_id"):
         if m.slug:
-            return m.slug
-        if m.condition_id:
-            return m.condition_id[:10]
-    return "none"
+            tags[m.id] = m.slug
+        elif m.condition_id:
+            tags[m.id] = m.condition_id[:10]
+    return tags
+
+
+# Only the columns the replay and report read; rows stay attribute-accessible.
+TRADE_FIELDS = ("id", "timestamp", "datetime", "market_id", "outcome", "asset", "side", "size", "price", "total_value")
+ACTIVITY_FIELDS = ("id", "timestamp", "datetime", "market_id", "activity_type", "outcome", "asset", "size", "usdc_size")
+
+
+def event_rows(qs, fields) -> List[SimpleNamespace]:
+    rows = qs.values(*fields).order_by("timestamp", "id").iterator(chunk_size=2000)
+    return [SimpleNamespace(**row) for row in rows]
 
 
 def collect_all_events(wallet):
-    trades = list(
-        Trade.objects.filter(wallet=wallet)
-        .select_related("market")
-        .order_by("timestamp", "id")
-    )
-    activities = list(
-        Activity.objects.filter(wallet=wallet)
-        .select_related("market")
-        .order_by("timestamp", "id")
-    )
+    trades = event_rows(Trade.objects.filter(wallet=wallet), TRADE_FIELDS)
+    activities = event_rows(Activity.objects.filter(wallet=wallet), ACTIVITY_FIELDS)
+
+    # Market tags are resolved once per market, not per event.
+    market_tags = load_market_tags({r.market_id for r in (*trades, *activities) if r.market_id})
+    for r in (*trades, *activities):
+        r.market_tag = market_tags.get(r.market_id, "none")
+
     all_events = [("trade", t) for t in trades] + [("activity", a) for a in activities]
     all_events.sort(key=lambda x: sort_key(x[0], x[1]))
     return trades, activities, all_events
 
 
 def preload(state: ReplayState, trades: List[Trade], activities: List[Activity]):
-    for t in trades:
-        if t.market_id:
-            state.market_outcomes[t.market_id].add(t.outcome)
-            if t.market and t.market.resolved and t.market.resolution_timestamp:
-                state.market_resolution[t.market_id] = (
-                    int(t.market.resolution_timestamp),
-                    t.market.winning_outcome,
-                )
-    for a in activities:
-        if a.market_id and a.market and a.market.resolved and a.market.resolution_timestamp:
-            state.market_resolution[a.market_id] = (
-                int(a.market.resolution_timestamp),
-                a.market.winning_outcome,
-            )
+    for market_id, outcome in {(t.market_id, t.outcome) for t in trades if t.market_id}:
+        state.market_outcomes[market_id].add(outcome)
+
+    # One row per distinct market instead of one write per event. Every
+    # traded market already has an outcome set, so reuse its keys.
+    market_ids = set(state.market_outcomes)
+    market_ids.update(a.market_id for a in activities if a.market_id)
+    resolved = (
+        Market.objects.filter(id__in=market_ids, resolved=True)
+        .exclude(resolution_timestamp__isnull=True)
+        .exclude(resolution_timestamp=0)
+        .only("id", "resolution_timestamp", "winning_outcome")
+    )
+    for m in resolved:
+        state.market_resolution[m.id] = (m.resolution_timestamp, m.winning_outcome)
 
 
 def apply_event(state: ReplayState, etype: str, obj) -> Tuple[Decimal, Decimal]:
@@ -216,11 +264,7 @@ def apply_event(state: ReplayState, etype: str, obj) -> Tuple[Decimal, Decimal]:
 
     elif a.activity_type == "REDEEM":
         if usdc > 0:
-            market_pos = [
-                (k, p)
-                for k, p in state.positions.items()
-                if k[0] == a.market_id and p.shares > EPS
-            ]
+            market_pos = [(k, v) for k, v in state.positions.market_items(a.market_id) if v.shares > EPS]
 
             # winner-first redeem ordering (if known); then by largest shares.
             winner = None
@@ -245,29 +289,31 @@ def apply_event(state: ReplayState, etype: str, obj) -> Tuple[Decimal, Decimal]:
                 remaining -= close_qty
 
         else:
-            for key, p in list(state.positions.items()):
-                if key[0] == a.market_id:
-                    realized += p.zero_out()
+            for _, pos in state.positions.market_items(a.market_id):
+                realized += pos.zero_out()
 
     return realized, reward
 
 
 def calc_unrealized(state: ReplayState, asof_ts: int, mtm: bool) -> Decimal:
+    # Without MTM every position is marked at its own avg cost.
+    if not mtm:
+        return ZERO
+
+    resolutions = state.market_resolution
+    last_prices = state.last_wallet_trade_price
     total = ZERO
-    for (market_id, outcome), p in state.positions.items():
+    for key, p in state.positions.items():
         if p.shares <= EPS:
             continue
 
-        mark = None
-        if mtm:
-            res = state.market_resolution.get(market_id)
-            if res and asof_ts >= res[0]:
-                mark = ONE if outcome == res[1] else ZERO
-            else:
-                mark = state.last_wallet_trade_price.get((market_id, outcome))
-
-        if mark is None:
-            mark = p.avg_cost
+        res = resolutions.get(key[0])
+        if res and asof_ts >= res[0]:
+            mark = ONE if key[1] == res[1] else ZERO
+        else:
+            mark = last_prices.get(key)
+            if mark is None:
+                continue
 
         total += p.shares * (mark - p.avg_cost)
 
@@ -282,7 +328,7 @@ def event_row_from_obj(idx: int, etype: str, obj) -> EventRow:
         raw = gross
         return EventRow(
             idx=idx,
-            ts=int(obj.timestamp),
+            ts=obj.timestamp,
             dt=obj.datetime,
             source="TRADE",
             etype=obj.side,
@@ -307,7 +353,7 @@ def event_row_from_obj(idx: int, etype: str, obj) -> EventRow:
 
     return EventRow(
         idx=idx,
-        ts=int(a.timestamp),
+        ts=a.timestamp,
         dt=a.datetime,
         source="ACTIVITY",
         etype=a.activity_type,
@@ -324,29 +370,111 @@ def event_row_from_obj(idx: int, etype: str, obj) -> EventRow:
     )
 
 
-def search_subsets(rows: List[EventRow], attr: str, target: Decimal, tolerance: Decimal = Decimal("0.02"), max_hits: int = 40):
-    vals = [getattr(r, attr) for r in rows]
-    n = len(rows)
-    hits = []
-
-    # Exhaustive if manageable.
+def half_subset_sums(vals: List[int]) -> List[int]:
+    """Subset sums of vals; entry i is the subset whose index mask is i."""
+    sums = [0]
+    for v in vals:
+        sums += [s + v for s in sums]
+    return sums
+
+
+def masks_by_size(k: int) -> Dict[int, List[int]]:
+    """Index masks over k elements, grouped by subset size."""
+    by_size: Dict[int, List[int]] = defaultdict(list)
+    for m in range(1 << k):
+        by_size[m.bit_count()].append(m)
+    return by_size
+
+
+def search_subsets_multi(
+    vectors: Dict[str, List[Decimal]],
+    target: Decimal,
+    tolerance: Decimal = Decimal("0.02"),
+    max_hits: int = 40,
+) -> Dict[str, List[Tuple[Decimal, Tuple[int, ...]]]]:
+    """
+    Subset search over several equal-length value vectors at once.
+
+    Hits per vector are the same as searching that vector alone; the
+    subset enumeration itself is shared between the vectors.
+    """
+    n = len(next(iter(vectors.values()), []))
+    hits: Dict[str, List[Tuple[Decimal, Tuple[int, ...]]]] = {name: [] for name in vectors}
+    lo_target = target - tolerance
+    hi_target = target + tolerance
+
+    # Sum of the r smallest / r largest values bounds every size-r subset,
+    # so sizes whose range misses the target window are skipped outright.
+    feasible = {}
+    for name, vals in vectors.items():
+        vals_sorted = sorted(vals)
+        min_sums = list(accumulate(vals_sorted, initial=ZERO))
+        max_sums = list(accumulate(reversed(vals_sorted), initial=ZERO))
+        feasible[name] = [lo <= hi_target and hi >= lo_target for lo, hi in zip(min_sums, max_sums)]
+
+    # Exhaustive if manageable: meet in the middle over the two halves,
+    # on integers scaled so every value is exact.
     if n <= 24:
+        exponents = [d.as_tuple().exponent for vals in vectors.values() for d in vals]
+        exponents += [target.as_tuple().exponent, tolerance.as_tuple().exponent]
+        scale = 10 ** max(0, -min(exponents))
+        target_i = int(target * scale)
+        tol_i = int(tolerance * scale)
+
+        h = n // 2
+        left_masks = masks_by_size(h)
+        right_masks = masks_by_size(n - h)
+        tables = {}
+        for name, vals in vectors.items():
+            ints = [int(v * scale) for v in vals]
+            left_sums = half_subset_sums(ints[:h])
+            right_sums = half_subset_sums(ints[h:])
+            left = {c: [(left_sums[m], m) for m in masks] for c, masks in left_masks.items()}
+            right = {}
+            for c, masks in right_masks.items():
+                entries = sorted((right_sums[m], m << h) for m in masks)
+                right[c] = (entries, [s for s, _ in entries])
+            tables[name] = (left, right)
+
+        # Same order as before: smallest subsets first, then by index.
         for r in range(1, n + 1):
-            for idxs in combinations(range(n), r):
-                s = sum(vals[i] for i in idxs)
-                if abs(s - target) <= tolerance:
-                    hits.append((s, idxs))
-                    if len(hits) >= max_hits:
-                        return hits
+            for name, vals in vectors.items():
+                found_hits = hits[name]
+                if len(found_hits) >= max_hits or not feasible[name][r]:
+                    continue
+                left, right = tables[name]
+                found = []
+                for k in range(max(0, r - (n - h)), min(h, r) + 1):
+                    entries, sums = right[r - k]
+                    for s, m in left[k]:
+                        lo = bisect_left(sums, target_i - tol_i - s)
+                        hi = bisect_right(sums, target_i + tol_i - s)
+                        for _, m2 in entries[lo:hi]:
+                            mask = m | m2
+                            found.append(tuple(i for i in range(n) if mask >> i & 1))
+                for idxs in sorted(found):
+                    found_hits.append((sum(vals[i] for i in idxs), idxs))
+                    if len(found_hits) >= max_hits:
+                        break
     else:
         # Fallback: try subset sizes up to 6 only.
         for r in range(1, 7):
+            active = [
+                (vals, hits[name])
+                for name, vals in vectors.items()
+                if len(hits[name]) < max_hits and feasible[name][r]
+            ]
+            if not active:
+                continue
             for idxs in combinations(range(n), r):
-                s = sum(vals[i] for i in idxs)
-                if abs(s - target) <= tolerance:
-                    hits.append((s, idxs))
-                    if len(hits) >= max_hits:
-                        return hits
+                for vals, found_hits in active:
+                    if len(found_hits) >= max_hits:
+                        continue
+                    s = sum(vals[i] for i in idxs)
+                    if abs(s - target) <= tolerance:
+                        found_hits.append((s, idxs))
+                        if all(len(f) >= max_hits for _, f in active):
+                            return hits
 
     return hits
 
@@ -370,7 +498,6 @@ def main():
     state = ReplayState()
     preload(state, trades, activities)
 
-    rows_7d: List[EventRow] = []
     rows_10d: List[EventRow] = []
 
     realized_at_7d_start = ZERO
@@ -381,7 +508,7 @@ def main():
     checkpoint_taken = False
 
     for idx, (etype, obj) in enumerate(all_events, start=1):
-        ts = int(obj.timestamp)
+        ts = obj.timestamp
 
         if (not checkpoint_taken) and ts >= CUTOFF_7D_TS:
             realized_at_7d_start = state.realized_total
@@ -390,18 +517,23 @@ def main():
             unreal_mtm_at_7d_start = calc_unrealized(state, CUTOFF_7D_TS, mtm=True)
             checkpoint_taken = True
 
-        row = event_row_from_obj(idx, etype, obj)
         realized_delta, reward_delta = apply_event(state, etype, obj)
         state.realized_total += realized_delta
         state.rewards_total += reward_delta
 
+        # Rows are only reported for the last 10 days; older events just
+        # advance the replay state.
+        if ts < CUTOFF_10D_TS:
+            continue
+
+        row = event_row_from_obj(idx, etype, obj)
         row.realized_avg_cost = realized_delta
         row.reward_component = reward_delta
 
-        if ts >= CUTOFF_7D_TS:
-            rows_7d.append(row)
-        if ts >= CUTOFF_10D_TS:
-            rows_10d.append(row)
+        rows_10d.append(row)
+
+    # Events are in timestamp order, so the 7-day rows are a suffix.
+    rows_7d = rows_10d[bisect_left(rows_10d, CUTOFF_7D_TS, key=lambda r: r.ts):]
 
     if not checkpoint_taken:
         realized_at_7d_start = state.realized_total
@@ -434,16 +566,23 @@ def main():
             f"cashflow={fmt_money(r.cashflow):>12} realized={fmt_money(r.realized_avg_cost):>12} reward={fmt_money(r.reward_component):>12}"
         )
 
-    # Totals by interpretation over 7d events
-    cf_7d = sum(r.cashflow for r in rows_7d)
-    realized_7d = sum(r.realized_avg_cost for r in rows_7d)
-    rewards_7d = sum(r.reward_component for r in rows_7d)
-    raw_7d = sum(r.raw_amount for r in rows_7d)
-
-    sells_only_7d = sum(r.cashflow for r in rows_7d if r.source == "TRADE" and r.etype == "SELL")
-    buys_only_7d = sum(-r.cashflow for r in rows_7d if r.source == "TRADE" and r.etype == "BUY")
-    redeems_only_7d = sum(r.cashflow for r in rows_7d if r.source == "ACTIVITY" and r.etype == "REDEEM")
-    rewards_only_7d = sum(r.reward_component for r in rows_7d)
+    # Totals by interpretation over 7d events (one pass)
+    cf_7d = realized_7d = rewards_7d = raw_7d = ZERO
+    sells_only_7d = buys_only_7d = redeems_only_7d = ZERO
+    for r in rows_7d:
+        cf_7d += r.cashflow
+        realized_7d += r.realized_avg_cost
+        rewards_7d += r.reward_component
+        raw_7d += r.raw_amount
+        if r.source == "TRADE":
+            if r.etype == "SELL":
+                sells_only_7d += r.cashflow
+            elif r.etype == "BUY":
+                buys_only_7d -= r.cashflow
+        elif r.etype == "REDEEM":
+            redeems_only_7d += r.cashflow
+    # Reward inflow is the reward component itself.
+    rewards_only_7d = rewards_7d
 
     total_no_mtm_start = realized_at_7d_start + rewards_at_7d_start + unreal_no_mtm_at_7d_start
     total_no_mtm_end = realized_at_end + rewards_at_end + unreal_no_mtm_at_end
@@ -501,21 +640,15 @@ def main():
     print("5) SUBSET SEARCHES CLOSE TO $7.56 (within $0.02)")
     print("=" * 140)
 
-    searches = [
-        ("cashflow", "cashflow"),
-        ("realized_avg_cost", "realized_avg_cost"),
-        ("reward_component", "reward_component"),
-    ]
+    vectors = {
+        "cashflow": [r.cashflow for r in rows_7d],
+        "realized_avg_cost": [r.realized_avg_cost for r in rows_7d],
+        "reward_component": [r.reward_component for r in rows_7d],
+        # Derived vector: realized+reward per event
+        "realized_plus_reward_per_event": [r.realized_avg_cost + r.reward_component for r in rows_7d],
+    }
 
-    # Derived vector: realized+reward per event
-    derived_rows = []
-    for r in rows_7d:
-        rr = EventRow(**{**r.__dict__})
-        rr.raw_amount = r.realized_avg_cost + r.reward_component
-        derived_rows.append(rr)
-
-    for name, attr in searches:
-        hits = search_subsets(rows_7d, attr, TARGET)
+    for name, hits in search_subsets_multi(vectors, TARGET).items():
         print(f"\nSubset metric: {name} | hits={len(hits)}")
         for s, idxs in hits[:15]:
             event_ids = [rows_7d[i].idx for i in idxs]
@@ -523,14 +656,6 @@ def main():
         if not hits:
             print("  (no subsets near target)")
 
-    hits_rr = search_subsets(derived_rows, "raw_amount", TARGET)
-    print(f"\nSubset metric: realized_plus_reward_per_event | hits={len(hits_rr)}")
-    for s, idxs in hits_rr[:15]:
-        event_ids = [rows_7d[i].idx for i in idxs]
-        print(f"  sum={fmt_money(s)}  idxs={event_ids}")
-    if not hits_rr:
-        print("  (no subsets near target)")
-
     print("\nDone.")
 
 
@@ -1,11 +1,19 @@
+import hashlib
+import json
 import os
-from collections import defaultdict
+from bisect import bisect_left
+from collections import defaultdict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from decimal import Decimal, getcontext
+from itertools import islice
+from operator import itemgetter
+from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
 import django
+import orjson
 import requests
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
@@ -18,6 +26,8 @@ except ModuleNotFoundError as exc:
     else:
         raise
 
+from django.db.models import CharField, DecimalField, F, Value  # noqa: E402
+
 from wallet_analysis.models import Activity, Trade, Wallet  # noqa: E402
 
 
@@ -28,11 +38,27 @@ WALLET_ADDRESS = "0xbdcd1a99e6880b8146f61323dcb799bb5b243e9c"
 CUTOFF_DT = datetime(2026, 2, 9, 16, 0, 0, tzinfo=timezone.utc)
 CUTOFF_TS = int(CUTOFF_DT.timestamp())
 TARGET_WEEKLY = Decimal("6.69")
+PAGE_WORKERS = 8
+
+# Bump SIM_CACHE_VERSION whenever the replay rules change.
+SIM_CACHE_DIR = Path.home() / ".cache" / "polymarket_pnl"
+SIM_CACHE_VERSION = 1
+
+
+ZERO = Decimal("0")
+ONE = Decimal("1")
+REDEEM_MATCH_TOL = Decimal("0.000001")
 
 
 def D(x) -> Decimal:
     if x is None:
-        return Decimal("0")
+        return ZERO
+    # DecimalField values are already Decimal; skip the str() round-trip.
+    if isinstance(x, Decimal):
+        return x
+    # int and str convert exactly as-is; only floats need their repr.
+    if type(x) is int or type(x) is str:
+        return Decimal(x)
     return Decimal(str(x))
 
 
@@ -40,54 +66,65 @@ def fmt_dt(ts: int) -> str:
     return datetime.fromtimestamp(int(ts), tz=timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
 
 
-def fetch_positions_all(user: str, limit: int = 500, endpoint: str = "https://data-api.polymarket.com/v1/positions", include_closed: bool = False) -> List[dict]:
+def fetch_positions_page(session: requests.Session, endpoint: str, params: dict, offset: int):
+    r = session.get(endpoint, params={**params, "offset": offset}, timeout=60)
+    r.raise_for_status()
+    # Pages are up to `limit` numeric-heavy dicts; orjson parses them faster.
+    return orjson.loads(r.content)
+
+
+def fetch_positions_all(
+    user: str,
+    limit: int = 500,
+    endpoint: str = "https://data-api.polymarket.com/v1/positions",
+    include_closed: bool = False,
+    session: Optional[requests.Session] = None,
+) -> List[dict]:
+    session = session or requests.Session()
+    params = {"user": user, "limit": limit}
+    if include_closed:
+        params["sizeThreshold"] = 0
+
     out: List[dict] = []
-    offset = 0
-    while True:
-        params = {"user": user, "limit": limit, "offset": offset}
-        if include_closed:
-            params["sizeThreshold"] = 0
-
-        r = requests.get(endpoint, params=params, timeout=60)
-        r.raise_for_status()
-        data = r.json()
-        if not isinstance(data, list):
-            print(f"Positions API returned non-list at offset={offset}: {type(data).__name__}")
-            break
-
-        out.extend(data)
-        print(f"Fetched from {endpoint}: batch={len(data)} offset={offset} total={len(out)} include_closed={include_closed}")
-
-        if len(data) < limit:
-            break
-        offset += limit
+    # The first page is fetched alone; once it comes back full, the next
+    # pages are requested PAGE_WORKERS at a time until one comes back short.
+    offsets = [0]
+    with ThreadPoolExecutor(max_workers=PAGE_WORKERS) as executor:
+        while offsets:
+            pages = executor.map(lambda o: fetch_positions_page(session, endpoint, params, o), offsets)
+            for offset, data in zip(offsets, pages):
+                if not isinstance(data, list):
+                    print(f"Positions API returned non-list at offset={offset}: {type(data).__name__}")
+                    return out
+
+                out.extend(data)
+                print(f"Fetched from {endpoint}: batch={len(data)} offset={offset} total={len(out)} include_closed={include_closed}")
+
+                if len(data) < limit:
+                    return out
+
+            next_offset = offsets[-1] + limit
+            offsets = [next_offset + i * limit for i in range(PAGE_WORKERS)]
 
     return out
 
 
 def summarize_positions(positions: List[dict], label: str):
-    sum_cash = Decimal("0")
-    sum_realized = Decimal("0")
-    sum_current = Decimal("0")
-    sum_initial = Decimal("0")
-    sum_current_minus_initial = Decimal("0")
-    sum_cash_plus_current_minus_initial = Decimal("0")
-    sum_cash_plus_current = Decimal("0")
+    sum_cash = ZERO
+    sum_realized = ZERO
+    sum_current = ZERO
+    sum_initial = ZERO
 
     for p in positions:
-        cash = D(p.get("cashPnl"))
-        rpnl = D(p.get("realizedPnl"))
-        cur = D(p.get("currentValue"))
-        init = D(p.get("initialValue"))
-        mtm = cur - init
-
-        sum_cash += cash
-        sum_realized += rpnl
-        sum_current += cur
-        sum_initial += init
-        sum_current_minus_initial += mtm
-        sum_cash_plus_current_minus_initial += cash + mtm
-        sum_cash_plus_current += cash + cur
+        sum_cash += D(p.get("cashPnl"))
+        sum_realized += D(p.get("realizedPnl"))
+        sum_current += D(p.get("currentValue"))
+        sum_initial += D(p.get("initialValue"))
+
+    # The combined sums are linear in the four above; Decimal keeps them exact.
+    sum_current_minus_initial = sum_current - sum_initial
+    sum_cash_plus_current_minus_initial = sum_cash + sum_current_minus_initial
+    sum_cash_plus_current = sum_cash + sum_current
 
     print(f"\n--- {label} ---")
     print(f"positions_count = {len(positions)}")
@@ -110,10 +147,10 @@ def summarize_positions(positions: List[dict], label: str):
     }
 
 
-@dataclass
+@dataclass(slots=True)
 class Pos:
-    shares: Decimal = Decimal("0")
-    avg_cost: Decimal = Decimal("0")
+    shares: Decimal = ZERO
+    avg_cost: Decimal = ZERO
 
     def buy(self, size: Decimal, price: Decimal):
         old_cost = self.shares * self.avg_cost
@@ -123,48 +160,98 @@ class Pos:
 
     def sell(self, size: Decimal, price: Decimal) -> Decimal:
         if self.shares <= 0:
-            return Decimal("0")
+            return ZERO
         qty = min(size, self.shares)
         pnl = qty * (price - self.avg_cost)
         self.shares -= qty
         if self.shares <= 0:
-            self.shares = Decimal("0")
-            self.avg_cost = Decimal("0")
+            self.shares = ZERO
+            self.avg_cost = ZERO
         return pnl
 
     def zero_out(self) -> Decimal:
         if self.shares <= 0:
-            return Decimal("0")
+            return ZERO
         pnl = -self.shares * self.avg_cost
-        self.shares = Decimal("0")
-        self.avg_cost = Decimal("0")
+        self.shares = ZERO
+        self.avg_cost = ZERO
         return pnl
 
 
+# Only the columns simulated_cash_pnl_at_cutoff reads; each table pads the
+# other's columns so both halves of the UNION line up.
+EVENT_FIELDS = ("kind", "timestamp", "id", "market_id", "outcome", "side", "price", "size", "activity_type", "usdc_size")
+EVENT_COLUMNS = tuple(f"ev_{name}" for name in EVENT_FIELDS)
+Event = namedtuple("Event", EVENT_FIELDS)
+TRADE_KIND = 0
+ACTIVITY_KIND = 1
+
+
+def event_annotations(kind: int, **padding) -> dict:
+    """
+    EVENT_COLUMNS annotations for one half of the UNION, in EVENT_FIELDS order.
+
+    Real columns are annotated too (via F, under an ev_ alias that can't clash
+    with the model field), so both halves select every column in the same order
+    whatever order a Django version emits model fields and annotations in.
+    """
+    annotations = {}
+    for name, column in zip(EVENT_FIELDS, EVENT_COLUMNS):
+        if name == "kind":
+            annotations[column] = Value(kind)
+        else:
+            annotations[column] = padding.get(name, F(name))
+    return annotations
+
+
 def load_events(wallet: Wallet):
-    trades = list(Trade.objects.filter(wallet=wallet).select_related("market").order_by("timestamp", "id"))
-    activities = list(Activity.objects.filter(wallet=wallet).select_related("market").order_by("timestamp", "id"))
-    events = [("trade", t.timestamp, t.id, t) for t in trades] + [("activity", a.timestamp, a.id, a) for a in activities]
-    events.sort(key=lambda x: (x[1], 0 if x[0] == "trade" else 1, x[2]))
+    # One UNION ALL query, ordered by the DB the same way the replay needs:
+    # trades before activities at the same timestamp, then by id.
+    decimal = DecimalField(max_digits=20, decimal_places=6)
+    trades_qs = Trade.objects.filter(wallet=wallet).annotate(**event_annotations(
+        TRADE_KIND,
+        activity_type=Value("", output_field=CharField()),
+        usdc_size=Value(None, output_field=decimal),
+    ))
+    activities_qs = Activity.objects.filter(wallet=wallet).annotate(**event_annotations(
+        ACTIVITY_KIND,
+        side=Value("", output_field=CharField()),
+        price=Value(None, output_field=decimal),
+    ))
+    # Both models default to -timestamp ordering; compound parts can't be ordered.
+    rows = (
+        trades_qs.order_by().values_list(*EVENT_COLUMNS)
+        .union(activities_qs.order_by().values_list(*EVENT_COLUMNS), all=True)
+        .order_by("ev_timestamp", "ev_kind", "ev_id")
+    )
+
+    trades, activities, events = [], [], []
+    for row in map(Event._make, rows.iterator(chunk_size=5000)):
+        if row.kind == TRADE_KIND:
+            trades.append(row)
+            events.append(("trade", row.timestamp, row.id, row))
+        else:
+            activities.append(row)
+            events.append(("activity", row.timestamp, row.id, row))
     return trades, activities, events
 
 
 def simulated_cash_pnl_at_cutoff(events, cutoff_ts: int) -> Decimal:
-    positions: Dict[Tuple[int, str], Pos] = defaultdict(Pos)
-    realized = Decimal("0")
-
-    for typ, ts, _id, obj in events:
-        if ts >= cutoff_ts:
-            break
+    # market_id -> outcome -> Pos, so a REDEEM only visits its own market.
+    positions: Dict[int, Dict[str, Pos]] = defaultdict(lambda: defaultdict(Pos))
+    realized = ZERO
 
+    # events are sorted by timestamp: replay only the prefix before the cutoff.
+    cut = bisect_left(events, cutoff_ts, key=itemgetter(1))
+    for typ, _ts, _id, obj in islice(events, cut):
         if typ == "trade":
-            key = (obj.market_id or -1, obj.outcome or "")
+            pos = positions[obj.market_id or -1][obj.outcome or ""]
             price = D(obj.price)
             size = D(obj.size)
             if obj.side == "BUY":
-                positions[key].buy(size, price)
+                pos.buy(size, price)
             else:
-                realized += positions[key].sell(size, price)
+                realized += pos.sell(size, price)
             continue
 
         # activities
@@ -175,68 +262,129 @@ def simulated_cash_pnl_at_cutoff(events, cutoff_ts: int) -> Decimal:
         if obj.activity_type != "REDEEM" or not obj.market_id:
             continue
 
+        market_positions = positions.get(obj.market_id)
+        if not market_positions:
+            continue
+
         size = D(obj.size)
         usdc = D(obj.usdc_size)
 
         if usdc > 0:
             # winning redeem at $1
-            candidates = [(k, p) for k, p in positions.items() if k[0] == obj.market_id and p.shares > 0]
+            candidates = [p for p in market_positions.values() if p.shares > 0]
             matched = False
-            for _k, p in candidates:
-                if abs(p.shares - size) <= Decimal("0.000001"):
-                    realized += p.sell(size, Decimal("1"))
+            for p in candidates:
+                if abs(p.shares - size) <= REDEEM_MATCH_TOL:
+                    realized += p.sell(size, ONE)
                     matched = True
                     break
             if not matched:
                 rem = size
-                for _k, p in sorted(candidates, key=lambda kv: kv[1].shares, reverse=True):
+                for p in sorted(candidates, key=lambda p: p.shares, reverse=True):
                     if rem <= 0:
                         break
                     q = min(rem, p.shares)
-                    realized += p.sell(q, Decimal("1"))
+                    realized += p.sell(q, ONE)
                     rem -= q
         else:
             # losing redeem => worthless
-            for _k, p in list(positions.items()):
-                if _k[0] == obj.market_id and p.shares > 0:
+            for p in market_positions.values():
+                if p.shares > 0:
                     realized += p.zero_out()
 
     return realized
 
 
-def try_pnl_endpoints(wallet: str):
+def probe_endpoint(session: requests.Session, base: str, params: dict):
+    try:
+        return session.get(base, params=params, timeout=45)
+    except Exception as e:
+        return e
+
+
+def cached_cash_pnl_at_cutoff(wallet: Wallet, trades, activities, events, cutoff_ts: int) -> Decimal:
+    """
+    simulated_cash_pnl_at_cutoff, cached on disk across runs.
+
+    The cache is keyed on a digest of every replayed column of every event,
+    so an edited or re-imported row invalidates it just like a new one.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for _typ, _ts, _id, obj in events:
+        digest.update(repr(tuple(obj)).encode())
+    fingerprint = f"{len(trades)}:{len(activities)}:{digest.hexdigest()}"
+    path = SIM_CACHE_DIR / f"cashpnl_{wallet.id}_{cutoff_ts}.json"
+    try:
+        cached = json.loads(path.read_text())
+        if cached["version"] == SIM_CACHE_VERSION and cached["fingerprint"] == fingerprint:
+            return Decimal(cached["realized"])
+    except (OSError, ValueError, KeyError):
+        pass
+
+    realized = simulated_cash_pnl_at_cutoff(events, cutoff_ts)
+    try:
+        SIM_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({
+            "version": SIM_CACHE_VERSION,
+            "fingerprint": fingerprint,
+            "realized": str(realized),
+        }))
+    except OSError as e:
+        print(f"Could not write simulation cache {path}: {e}")
+    return realized
+
+
+def try_pnl_endpoints(wallet: str, session: Optional[requests.Session] = None) -> Optional[Tuple[str, dict]]:
+    """Probe PnL endpoint variants; return the first (in probe order) serving a non-empty JSON list."""
     print("\n=== Try profile PnL endpoints (chart source hunt) ===")
+    session = session or requests.Session()
     endpoints = [
         ("https://data-api.polymarket.com/pnl", ["user", "address", "wallet"]),
         ("https://data-api.polymarket.com/v1/pnl", ["user", "address", "wallet"]),
         (f"https://data-api.polymarket.com/pnl/{wallet}", [None]),
         (f"https://data-api.polymarket.com/v1/pnl/{wallet}", [None]),
     ]
-
-    for base, keys in endpoints:
-        for key in keys:
-            params = {} if key is None else {key: wallet}
-            try:
-                r = requests.get(base, params=params, timeout=45)
-                ct = r.headers.get("content-type", "")
-                try:
-                    payload = r.json()
-                    jtype = type(payload).__name__
-                    if isinstance(payload, list):
-                        preview = payload[:2]
-                        size = len(payload)
-                    elif isinstance(payload, dict):
-                        preview = {k: payload[k] for k in list(payload.keys())[:6]}
-                        size = len(payload)
-                    else:
-                        preview = str(payload)[:250]
-                        size = None
-                    print(f"GET {r.url} -> HTTP {r.status_code}, json={jtype}, size={size}, ct={ct}")
-                    print(f"  preview: {preview}")
-                except Exception:
-                    print(f"GET {r.url} -> HTTP {r.status_code}, non-json ct={ct}, body={r.text[:300]!r}")
-            except Exception as e:
-                print(f"GET {base} params={params} -> ERROR {e}")
+    probes = [(base, {} if key is None else {key: wallet}) for base, keys in endpoints for key in keys]
+
+    # All probes run at once; results are reported in probe order, and the
+    # first hit returns without waiting for the probes after it.
+    executor = ThreadPoolExecutor(max_workers=len(probes))
+    try:
+        futures = [executor.submit(probe_endpoint, session, base, params) for base, params in probes]
+        for (base, params), future in zip(probes, futures):
+            if report_probe(base, params, future.result()):
+                print(f"  -> chart source found: {base} params={params}")
+                return base, params
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    return None
+
+
+def report_probe(base: str, params: dict, r) -> bool:
+    """Print one probe result; True when it is a 2xx non-empty JSON list."""
+    if isinstance(r, Exception):
+        print(f"GET {base} params={params} -> ERROR {r}")
+        return False
+    ct = r.headers.get("content-type", "")
+    try:
+        payload = r.json()
+    except Exception:
+        print(f"GET {r.url} -> HTTP {r.status_code}, non-json ct={ct}, body={r.text[:300]!r}")
+        return False
+
+    jtype = type(payload).__name__
+    if isinstance(payload, list):
+        preview = payload[:2]
+        size = len(payload)
+    elif isinstance(payload, dict):
+        preview = {k: payload[k] for k in list(payload.keys())[:6]}
+        size = len(payload)
+    else:
+        preview = str(payload)[:250]
+        size = None
+    print(f"GET {r.url} -> HTTP {r.status_code}, json={jtype}, size={size}, ct={ct}")
+    print(f"  preview: {preview}")
+    return r.ok and isinstance(payload, list) and bool(payload)
 
 
 def main():
@@ -248,12 +396,14 @@ def main():
     print(f"Reference weekly shown by profile: ${TARGET_WEEKLY}")
 
     print("\n=== 1) Fetch ALL current positions from API ===")
+    session = requests.Session()
     # Requested endpoint
     positions_v1 = fetch_positions_all(
         WALLET_ADDRESS,
         limit=500,
         endpoint="https://data-api.polymarket.com/v1/positions",
         include_closed=False,
+        session=session,
     )
     sums_v1 = summarize_positions(positions_v1, "v1/positions (default params)")
 
@@ -263,6 +413,7 @@ def main():
         limit=500,
         endpoint="https://data-api.polymarket.com/positions",
         include_closed=True,
+        session=session,
     )
     sums_plain_all = summarize_positions(positions_plain_all, "positions + sizeThreshold=0 (includes closed)")
 
@@ -275,7 +426,7 @@ def main():
     print("\n=== 2-4) Simulate cashPnl at cutoff via avg cost from DB events ===")
     wallet = Wallet.objects.get(id=WALLET_ID)
     trades, activities, events = load_events(wallet)
-    y_cutoff = simulated_cash_pnl_at_cutoff(events, CUTOFF_TS)
+    y_cutoff = cached_cash_pnl_at_cutoff(wallet, trades, activities, events, CUTOFF_TS)
 
     print(f"db_trade_count = {len(trades)}")
     print(f"db_activity_count = {len(activities)}")
@@ -295,7 +446,7 @@ def main():
     print(f"difference_alt_vs_target_6.69 = {(weekly_alt_delta - TARGET_WEEKLY):+.8f}")
 
     print("\n=== 5) Probe possible profile chart PnL endpoints ===")
-    try_pnl_endpoints(WALLET_ADDRESS)
+    try_pnl_endpoints(WALLET_ADDRESS, session=session)
 
     print("\n=== 6) KEY IDEA recap ===")
     print(f"X (sum cashPnl now) = {x_now:.8f}")
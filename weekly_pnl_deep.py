@@ -1,9 +1,14 @@
 import os
 import json
+import heapq
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from collections import defaultdict
 from datetime import datetime, timezone, timedelta
 from decimal import Decimal
+from itertools import accumulate, islice
+from operator import attrgetter, itemgetter
 from typing import Dict, List, Optional, Tuple, Iterable, Set
 
 import django
@@ -20,7 +25,7 @@ except ModuleNotFoundError as exc:
     else:
         raise
 
-from wallet_analysis.models import Wallet, Trade, Activity  # noqa: E402
+from wallet_analysis.models import Wallet, Trade, Activity, Market  # noqa: E402
 
 
 WALLET_ID = 7
@@ -32,12 +37,26 @@ ASOF_END_DT = datetime(2026, 2, 16, 23, 59, 59, tzinfo=timezone.utc)
 ASOF_END_TS = int(ASOF_END_DT.timestamp())
 FEB9_START_TS = int(datetime(2026, 2, 9, 0, 0, 0, tzinfo=timezone.utc).timestamp())
 
+ACTIVITY_URL = "https://data-api.polymarket.com/activity"
+PAGE_WORKERS = 8
+
+# One keep-alive session for every Polymarket call, so the TLS handshake
+# is paid once per host instead of once per request.
+SESSION = requests.Session()
+SESSION.headers.update({"Accept": "application/json", "User-Agent": "PolymarketWalletAnalyzer/1.0"})
+
 EPS = Decimal("0.0000001")
 ONE = Decimal("1")
 ZERO = Decimal("0")
+REDEEM_MATCH_TOL = Decimal("0.5")
+# MERGE fallback for markets with no traded outcomes yet.
+BINARY_OUTCOMES = frozenset(("Yes", "No"))
 
 
 def D(x) -> Decimal:
+    # DecimalField values are already Decimal; skip the str() round-trip.
+    if isinstance(x, Decimal):
+        return x
     return Decimal(str(x))
 
 
@@ -45,7 +64,7 @@ def fmt_ts(ts: int) -> str:
     return datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
 
 
-@dataclass
+@dataclass(slots=True)
 class Pos:
     shares: Decimal = ZERO
     avg_cost: Decimal = ZERO
@@ -77,7 +96,23 @@ class Pos:
         return pnl
 
 
-@dataclass
+class PositionBook(dict):
+    """(market_id, outcome) -> Pos, with per-market keys in insertion order."""
+
+    def __init__(self):
+        super().__init__()
+        self.by_market: Dict[int, List[Tuple[int, str]]] = defaultdict(list)
+
+    def __missing__(self, key: Tuple[int, str]) -> Pos:
+        pos = self[key] = Pos()
+        self.by_market[key[0]].append(key)
+        return pos
+
+    def market_items(self, market_id: int) -> List[Tuple[Tuple[int, str], Pos]]:
+        return [(k, self[k]) for k in self.by_market.get(market_id, ())]
+
+
+@dataclass(slots=True)
 class EventDelta:
     ts: int
     realized: Decimal = ZERO
@@ -86,55 +121,86 @@ class EventDelta:
 
 @dataclass
 class ReplayState:
-    positions: Dict[Tuple[int, str], Pos] = field(default_factory=lambda: defaultdict(Pos))
+    positions: PositionBook = field(default_factory=PositionBook)
     market_outcomes: Dict[int, Set[str]] = field(default_factory=lambda: defaultdict(set))
     market_resolution: Dict[int, Tuple[int, str]] = field(default_factory=dict)
     last_trade_price: Dict[Tuple[int, str], Decimal] = field(default_factory=dict)
-    realized_total: Decimal = ZERO
-    rewards_total: Decimal = ZERO
 
 
-def sort_key(event_type: str, obj):
-    if event_type == "trade":
-        return (obj.timestamp, 0, obj.id)
+TRADE_KIND = 0
+ACTIVITY_KIND = 1
+
+
+def event_priority(kind: int, obj) -> int:
+    if kind == TRADE_KIND:
+        return 0
 
     if obj.activity_type == "REDEEM":
         if D(obj.usdc_size) > 0:
-            return (obj.timestamp, 1, obj.id)  # winner first
-        return (obj.timestamp, 3, obj.id)      # loser last
+            return 1  # winner first
+        return 3      # loser last
 
     if obj.activity_type in ("SPLIT", "CONVERSION", "MERGE"):
-        return (obj.timestamp, 0, obj.id)
+        return 0
+
+    return 2
+
 
-    return (obj.timestamp, 2, obj.id)
+def make_event(kind: int, obj) -> Tuple[int, int, int, int, object]:
+    # (ts, priority, id, kind, row): sorts in replay order with no key func,
+    # and the timestamp is cast once here rather than on every replay.
+    return (int(obj.timestamp), event_priority(kind, obj), obj.id, kind, obj)
+
+
+# Only the columns the replay and the window summaries read.
+TRADE_FIELDS = ("id", "timestamp", "market_id", "outcome", "side", "price", "size", "total_value")
+ACTIVITY_FIELDS = ("id", "timestamp", "market_id", "activity_type", "size", "usdc_size")
+
+
+def event_rows(qs, fields) -> list:
+    # Named tuples keep attribute access without building model instances.
+    return list(qs.values_list(*fields, named=True).order_by("timestamp", "id").iterator(chunk_size=5000))
 
 
 def collect_events():
     wallet = Wallet.objects.get(id=WALLET_ID)
-    trades = list(Trade.objects.filter(wallet=wallet).select_related("market").order_by("timestamp", "id"))
-    activities = list(Activity.objects.filter(wallet=wallet).select_related("market").order_by("timestamp", "id"))
-    events = [("trade", t) for t in trades] + [("activity", a) for a in activities]
-    events.sort(key=lambda x: sort_key(x[0], x[1]))
+    trades = event_rows(Trade.objects.filter(wallet=wallet), TRADE_FIELDS)
+    activities = event_rows(Activity.objects.filter(wallet=wallet), ACTIVITY_FIELDS)
+    events = [make_event(TRADE_KIND, t) for t in trades]
+    events.extend(make_event(ACTIVITY_KIND, a) for a in activities)
+    events.sort()
     return trades, activities, events
 
 
-def preload_market_data(state: ReplayState, trades: Iterable[Trade], activities: Iterable[Activity]):
+def time_window(rows: list, start_ts: int, end_ts: int) -> list:
+    # rows come back ordered by timestamp (see event_rows).
+    lo = bisect_left(rows, start_ts, key=attrgetter("timestamp"))
+    hi = bisect_right(rows, end_ts, lo=lo, key=attrgetter("timestamp"))
+    return rows[lo:hi]
+
+
+def preload_market_data(state: ReplayState, trades: Iterable, activities: Iterable):
     for t in trades:
         if t.market_id:
             state.market_outcomes[t.market_id].add(t.outcome)
-            if t.market and t.market.resolved and t.market.resolution_timestamp:
-                state.market_resolution[t.market_id] = (int(t.market.resolution_timestamp), t.market.winning_outcome)
 
-    for a in activities:
-        if a.market_id and a.market and a.market.resolved and a.market.resolution_timestamp:
-            state.market_resolution[a.market_id] = (int(a.market.resolution_timestamp), a.market.winning_outcome)
+    # One row per distinct market instead of one lookup per event.
+    market_ids = set(state.market_outcomes)
+    market_ids.update(a.market_id for a in activities if a.market_id)
+    resolved = (
+        Market.objects.filter(id__in=market_ids, resolved=True)
+        .exclude(resolution_timestamp__isnull=True)
+        .exclude(resolution_timestamp=0)
+        .values_list("id", "resolution_timestamp", "winning_outcome")
+    )
+    for market_id, resolution_ts, winning_outcome in resolved:
+        state.market_resolution[market_id] = (resolution_ts, winning_outcome)
 
 
-def apply_event(state: ReplayState, event_type: str, obj) -> EventDelta:
-    ts = int(obj.timestamp)
+def apply_event(state: ReplayState, kind: int, obj, ts: int) -> EventDelta:
     d = EventDelta(ts=ts)
 
-    if event_type == "trade":
+    if kind == TRADE_KIND:
         t = obj
         if not t.market_id:
             return d
@@ -151,14 +217,11 @@ def apply_event(state: ReplayState, event_type: str, obj) -> EventDelta:
             d.realized += pos.buy(size, price)
         else:
             d.realized += pos.sell(size, price)
-
-        state.realized_total += d.realized
         return d
 
     a = obj
     if a.activity_type == "REWARD":
         d.rewards += D(a.usdc_size)
-        state.rewards_total += d.rewards
         return d
 
     if not a.market_id:
@@ -172,7 +235,7 @@ def apply_event(state: ReplayState, event_type: str, obj) -> EventDelta:
         return d
 
     if a.activity_type == "MERGE":
-        outcomes = state.market_outcomes.get(a.market_id, {"Yes", "No"})
+        outcomes = state.market_outcomes.get(a.market_id, BINARY_OUTCOMES)
         n = len(outcomes)
         if size > 0 and n > 0:
             rev_per_share = usdc / (size * n)
@@ -184,10 +247,10 @@ def apply_event(state: ReplayState, event_type: str, obj) -> EventDelta:
 
     elif a.activity_type == "REDEEM":
         if usdc > 0:
-            market_pos = [(k, v) for k, v in state.positions.items() if k[0] == a.market_id and v.shares > EPS]
+            market_pos = [(k, v) for k, v in state.positions.market_items(a.market_id) if v.shares > EPS]
             matched = False
             for key, pos in market_pos:
-                if abs(pos.shares - size) < Decimal("0.5"):
+                if abs(pos.shares - size) < REDEEM_MATCH_TOL:
                     d.realized += pos.sell(size, ONE)
                     matched = True
                     break
@@ -200,41 +263,46 @@ def apply_event(state: ReplayState, event_type: str, obj) -> EventDelta:
                     d.realized += pos.sell(qty, ONE)
                     remaining -= qty
         else:
-            for key, pos in list(state.positions.items()):
-                if key[0] == a.market_id and pos.shares > EPS:
+            for key, pos in state.positions.market_items(a.market_id):
+                if pos.shares > EPS:
                     d.realized += pos.zero_out()
 
-    state.realized_total += d.realized
     return d
 
 
-def replay_to(ts_cutoff: int, trades, activities, events) -> ReplayState:
-    state = ReplayState()
-    preload_market_data(state, trades, activities)
-    for etype, obj in events:
-        if int(obj.timestamp) > ts_cutoff:
-            break
-        apply_event(state, etype, obj)
-    return state
+def advance(state: ReplayState, events, start: int, ts_cutoff: int) -> int:
+    """Apply events[start:] up to and including ts_cutoff; return the next index."""
+    # events are sorted by timestamp first (see make_event).
+    end = bisect_right(events, ts_cutoff, lo=start, key=itemgetter(0))
+    for ts, _, _, kind, obj in islice(events, start, end):
+        apply_event(state, kind, obj, ts)
+    return end
 
 
 def replay_all_deltas(trades, activities, events) -> List[EventDelta]:
     state = ReplayState()
     preload_market_data(state, trades, activities)
     out = []
-    for etype, obj in events:
-        out.append(apply_event(state, etype, obj))
+    for ts, _, _, kind, obj in events:
+        out.append(apply_event(state, kind, obj, ts))
     return out
 
 
-def cumulative_realized_rewards_at(deltas: List[EventDelta], ts: int) -> Decimal:
-    total = ZERO
-    for d in deltas:
-        if d.ts <= ts:
-            total += d.realized + d.rewards
-        else:
-            break
-    return total
+def realized_rewards_prefix(deltas: List[EventDelta]) -> Tuple[List[int], List[Decimal]]:
+    """
+    Event timestamps and running realized+rewards totals for ts-sorted deltas.
+
+    cum[i] is the total over the first i deltas, so each cutoff lookup is a
+    bisect instead of a walk over every event.
+    """
+    timestamps = [d.ts for d in deltas]
+    cum = list(accumulate((d.realized + d.rewards for d in deltas), initial=ZERO))
+    return timestamps, cum
+
+
+def cumulative_realized_rewards_at(prefix: Tuple[List[int], List[Decimal]], ts: int) -> Decimal:
+    timestamps, cum = prefix
+    return cum[bisect_right(timestamps, ts)]
 
 
 def calc_unrealized(state: ReplayState, asof_ts: int, mtm=True) -> Decimal:
@@ -274,7 +342,7 @@ def calc_position_value(state: ReplayState, asof_ts: int) -> Decimal:
 
 
 def fetch_json(url: str, timeout=30):
-    r = requests.get(url, timeout=timeout)
+    r = SESSION.get(url, timeout=timeout)
     status = r.status_code
     text = r.text
     try:
@@ -284,23 +352,33 @@ def fetch_json(url: str, timeout=30):
     return status, data, text
 
 
+NUMERIC_KEYS = ("pnl", "value", "y", "p", "totalPnl", "profit", "amount")
+SERIES_KEYS = ("data", "points", "history", "results")
+
+
 def pick_numeric(d: dict) -> Optional[Decimal]:
-    for k in ("pnl", "value", "y", "p", "totalPnl", "profit", "amount"):
-        if k in d and d[k] is not None:
-            try:
-                return D(d[k])
-            except Exception:
-                pass
+    for k in NUMERIC_KEYS:
+        v = d.get(k)
+        if v is None:
+            continue
+        try:
+            return D(v)
+        except Exception:
+            pass
     return None
 
 
-def parse_timeseries_delta(payload) -> Optional[Decimal]:
+def unwrap_series(payload):
+    # Sometimes wrapped
     if isinstance(payload, dict):
-        # Sometimes wrapped
-        for k in ("data", "points", "history", "results"):
-            if k in payload and isinstance(payload[k], list):
-                payload = payload[k]
-                break
+        for k in SERIES_KEYS:
+            if isinstance(payload.get(k), list):
+                return payload[k]
+    return payload
+
+
+def parse_timeseries_delta(payload) -> Optional[Decimal]:
+    payload = unwrap_series(payload)
     if not isinstance(payload, list) or len(payload) < 2:
         return None
     first = pick_numeric(payload[0]) if isinstance(payload[0], dict) else None
@@ -310,59 +388,84 @@ def parse_timeseries_delta(payload) -> Optional[Decimal]:
     return last - first
 
 
-def fetch_rewards_from_api(since_ts: int, until_ts: int) -> Tuple[int, Decimal, int]:
-    session = requests.Session()
-    offset = 0
+def fetch_activity_page(session: requests.Session, params: dict, offset: int) -> Optional[list]:
+    resp = session.get(ACTIVITY_URL, params={**params, "offset": offset}, timeout=30)
+    if resp.status_code != 200:
+        return None
+    rows = resp.json()
+    if not isinstance(rows, list) or not rows:
+        return None
+    return rows
+
+
+def fetch_rewards_from_api(
+    since_ts: int,
+    until_ts: int,
+    session: Optional[requests.Session] = None,
+) -> Tuple[int, Decimal, int]:
+    session = session or SESSION
     limit = 500
+    params = {"user": WALLET_ADDRESS, "limit": limit}
     total_rewards = ZERO
     reward_count = 0
     total_rows = 0
 
-    while True:
-        params = {
-            "user": WALLET_ADDRESS,
-            "limit": limit,
-            "offset": offset,
-        }
-        resp = session.get("https://data-api.polymarket.com/activity", params=params, timeout=30)
-        if resp.status_code != 200:
-            break
-        rows = resp.json()
-        if not isinstance(rows, list) or not rows:
-            break
-
-        total_rows += len(rows)
-        for r in rows:
-            ts = int(r.get("timestamp", 0) or 0)
-            if ts < since_ts:
-                continue
-            if ts > until_ts:
-                continue
-            typ = str(r.get("type") or r.get("activityType") or "").upper()
-            if typ == "REWARD":
-                reward_count += 1
-                total_rewards += D(r.get("usdcSize", r.get("amount", 0)))
-
-        oldest = min(int(x.get("timestamp", 0) or 0) for x in rows)
-        if oldest < since_ts or len(rows) < limit:
-            break
-        offset += limit
+    # Page 0 is fetched alone; while pages come back full and still newer
+    # than since_ts, the next PAGE_WORKERS pages are requested together and
+    # drained in offset order.
+    offsets = [0]
+    with ThreadPoolExecutor(max_workers=PAGE_WORKERS) as executor:
+        while offsets:
+            pages = executor.map(lambda o: fetch_activity_page(session, params, o), offsets)
+            for rows in pages:
+                if rows is None:
+                    return total_rows, total_rewards, reward_count
+
+                total_rows += len(rows)
+                oldest = None
+                for r in rows:
+                    ts = int(r.get("timestamp", 0) or 0)
+                    if oldest is None or ts < oldest:
+                        oldest = ts
+                    if ts < since_ts or ts > until_ts:
+                        continue
+                    typ = str(r.get("type") or r.get("activityType") or "").upper()
+                    if typ == "REWARD":
+                        reward_count += 1
+                        total_rewards += D(r.get("usdcSize", r.get("amount", 0)))
+
+                if oldest < since_ts or len(rows) < limit:
+                    return total_rows, total_rewards, reward_count
+
+            next_offset = offsets[-1] + limit
+            offsets = [next_offset + i * limit for i in range(PAGE_WORKERS)]
 
     return total_rows, total_rewards, reward_count
 
 
 def nearest_combos(target: Decimal, pieces: List[Tuple[str, Decimal]], max_terms=4, topn=12):
-    from itertools import combinations
+    """Closest sums of up to ``max_terms`` pieces to ``target``.
 
-    out = []
+    Combos are enumerated depth-first, carrying the running sum, so each
+    one costs a single addition. Only the ``topn`` best are kept, ordered
+    by (distance, |sum|) and then by size and index order for ties.
+    """
     n = len(pieces)
-    for r in range(1, min(max_terms, n) + 1):
-        for idxs in combinations(range(n), r):
-            s = sum(pieces[i][1] for i in idxs)
-            labels = [pieces[i][0] for i in idxs]
-            out.append((abs(s - target), s, labels))
-    out.sort(key=lambda x: (x[0], abs(x[1])))
-    return out[:topn]
+    values = [v for _, v in pieces]
+    best = []
+
+    def dfs(start: int, partial: Decimal, idxs: Tuple[int, ...]):
+        for i in range(start, n):
+            s = partial + values[i]
+            combo = idxs + (i,)
+            best.append((abs(s - target), abs(s), len(combo), combo, s))
+            if len(combo) < max_terms:
+                dfs(i + 1, s, combo)
+
+    if max_terms > 0:
+        dfs(0, ZERO, ())
+    top = heapq.nsmallest(topn, best)
+    return [(diff, s, [pieces[i][0] for i in combo]) for diff, _, _, combo, s in top]
 
 
 def main():
@@ -375,6 +478,7 @@ def main():
     trades, activities, events = collect_events()
     deltas = replay_all_deltas(trades, activities, events)
     deltas.sort(key=lambda x: x.ts)
+    prefix = realized_rewards_prefix(deltas)
 
     print("\n[1] Polymarket API references")
     lb_url = f"https://data-api.polymarket.com/v1/leaderboard?timePeriod=week&orderBy=PNL&limit=1&offset=0&category=overall&user={WALLET_ADDRESS}"
@@ -406,12 +510,7 @@ def main():
             if d is not None:
                 ts_delta = d
                 ts_url_used = u
-                arr = data
-                if isinstance(arr, dict):
-                    for k in ("data", "points", "history", "results"):
-                        if isinstance(arr.get(k), list):
-                            arr = arr[k]
-                            break
+                arr = unwrap_series(data)
                 if isinstance(arr, list) and arr:
                     print(f"  points = {len(arr)}")
                     print(f"  first = {arr[0]}")
@@ -425,19 +524,31 @@ def main():
             print(f"  non-JSON body(sample)={short!r}")
 
     print("\n[2] Known Feb 9-16 event window from DB")
-    t_window = [t for t in trades if FEB9_START_TS <= int(t.timestamp) <= ASOF_END_TS]
-    a_window = [a for a in activities if FEB9_START_TS <= int(a.timestamp) <= ASOF_END_TS]
-
-    sell_inflow = sum(D(t.total_value) for t in t_window if t.side == "SELL")
-    buy_outflow = sum(D(t.total_value) for t in t_window if t.side == "BUY")
-    redeem_usdc = sum(D(a.usdc_size) for a in a_window if a.activity_type == "REDEEM")
-    reward_usdc = sum(D(a.usdc_size) for a in a_window if a.activity_type == "REWARD")
-
-    start_cum = cumulative_realized_rewards_at(deltas, FEB9_START_TS - 1)
-    end_cum = cumulative_realized_rewards_at(deltas, ASOF_END_TS)
+    t_window = time_window(trades, FEB9_START_TS, ASOF_END_TS)
+    a_window = time_window(activities, FEB9_START_TS, ASOF_END_TS)
+
+    buy_n = sell_n = 0
+    sell_inflow = buy_outflow = ZERO
+    for t in t_window:
+        if t.side == "SELL":
+            sell_n += 1
+            sell_inflow += t.total_value
+        elif t.side == "BUY":
+            buy_n += 1
+            buy_outflow += t.total_value
+
+    redeem_usdc = reward_usdc = ZERO
+    for a in a_window:
+        if a.activity_type == "REDEEM":
+            redeem_usdc += a.usdc_size
+        elif a.activity_type == "REWARD":
+            reward_usdc += a.usdc_size
+
+    start_cum = cumulative_realized_rewards_at(prefix, FEB9_START_TS - 1)
+    end_cum = cumulative_realized_rewards_at(prefix, ASOF_END_TS)
     realized_rewards_window = end_cum - start_cum
 
-    print(f"- trades in window: {len(t_window)} (BUY={sum(1 for t in t_window if t.side=='BUY')}, SELL={sum(1 for t in t_window if t.side=='SELL')})")
+    print(f"- trades in window: {len(t_window)} (BUY={buy_n}, SELL={sell_n})")
     print(f"- activities in window: {len(a_window)}")
     print(f"- sell inflow: ${sell_inflow:.4f}")
     print(f"- buy outflow: ${buy_outflow:.4f}")
@@ -454,8 +565,8 @@ def main():
     while cur <= sweep_end:
         st = int(cur.timestamp())
         en = st + 7 * 24 * 3600 - 1
-        st_cum = cumulative_realized_rewards_at(deltas, st - 1)
-        en_cum = cumulative_realized_rewards_at(deltas, en)
+        st_cum = cumulative_realized_rewards_at(prefix, st - 1)
+        en_cum = cumulative_realized_rewards_at(prefix, en)
         v = en_cum - st_cum
         diff = abs(v - TARGET_PROFILE_WEEK)
         best.append((diff, st, en, v))
@@ -468,22 +579,24 @@ def main():
 
     print("\n[4] Unrealized-only change / net position value changes")
     week_start_ts = ASOF_END_TS - 7 * 24 * 3600 + 1
-    state_start = replay_to(week_start_ts - 1, trades, activities, events)
-    state_end = replay_to(ASOF_END_TS, trades, activities, events)
+    # One replay: value the week-start snapshot, then carry on to the end.
+    state = ReplayState()
+    preload_market_data(state, trades, activities)
+    next_idx = advance(state, events, 0, week_start_ts - 1)
+    u_start_mtm = calc_unrealized(state, week_start_ts - 1, mtm=True)
+    u_start_no = calc_unrealized(state, week_start_ts - 1, mtm=False)
+    v_start = calc_position_value(state, week_start_ts - 1)
 
-    u_start_mtm = calc_unrealized(state_start, week_start_ts - 1, mtm=True)
-    u_end_mtm = calc_unrealized(state_end, ASOF_END_TS, mtm=True)
-    du_mtm = u_end_mtm - u_start_mtm
+    advance(state, events, next_idx, ASOF_END_TS)
+    u_end_mtm = calc_unrealized(state, ASOF_END_TS, mtm=True)
+    u_end_no = calc_unrealized(state, ASOF_END_TS, mtm=False)
+    v_end = calc_position_value(state, ASOF_END_TS)
 
-    u_start_no = calc_unrealized(state_start, week_start_ts - 1, mtm=False)
-    u_end_no = calc_unrealized(state_end, ASOF_END_TS, mtm=False)
+    du_mtm = u_end_mtm - u_start_mtm
     du_no = u_end_no - u_start_no
-
-    v_start = calc_position_value(state_start, week_start_ts - 1)
-    v_end = calc_position_value(state_end, ASOF_END_TS)
     dv = v_end - v_start
 
-    realized_week = cumulative_realized_rewards_at(deltas, ASOF_END_TS) - cumulative_realized_rewards_at(deltas, week_start_ts - 1)
+    realized_week = cumulative_realized_rewards_at(prefix, ASOF_END_TS) - cumulative_realized_rewards_at(prefix, week_start_ts - 1)
 
     print(f"- rolling week start used: {fmt_ts(week_start_ts)}")
     print(f"- dUnrealized (MTM) = ${du_mtm:.6f}")
@@ -1,13 +1,24 @@
 import os
+import sys
 import json
+import heapq
 from decimal import Decimal, getcontext
+from bisect import bisect_left
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime, timezone
+from functools import lru_cache
+from itertools import islice
+from pathlib import Path
+from operator import attrgetter, itemgetter
 from typing import Dict, List, Optional, Tuple
 
+import orjson
 import requests
 import django
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
 try:
@@ -33,52 +44,104 @@ TARGET_NOW = Decimal("6.69")
 TARGET_BEFORE = Decimal("7.56")
 TARGET_DROP = TARGET_NOW - TARGET_BEFORE  # -0.87
 
+ZERO = Decimal("0")
+ONE = Decimal("1")
+REDEEM_MATCH_TOL = Decimal("0.000001")
+
+POSITIONS_URL = "https://data-api.polymarket.com/v1/positions"
+# Remembers which timeseries candidate served points last run.
+PNL_ENDPOINT_CACHE = Path.home() / ".cache" / "polymarket_pnl" / "pnl_endpoint.json"
+
+# One keep-alive session for every Polymarket call, so the TLS handshake
+# is paid once per host instead of once per request. Connection errors
+# are retried with a short backoff; HTTP statuses are reported as-is.
+SESSION = requests.Session()
+SESSION.headers.update({"Accept": "application/json", "User-Agent": "PolymarketWalletAnalyzer/1.0"})
+SESSION.mount("https://", HTTPAdapter(pool_maxsize=8, max_retries=Retry(total=2, backoff_factor=0.3)))
+
 
 def D(x) -> Decimal:
     if x is None:
-        return Decimal("0")
+        return ZERO
+    # DecimalField values are already Decimal; skip the str() round-trip.
+    if isinstance(x, Decimal):
+        return x
+    # int and str convert exactly as-is; only floats need their repr.
+    if type(x) is int or type(x) is str:
+        return Decimal(x)
     return Decimal(str(x))
 
 
+@lru_cache(maxsize=4096)
+def _fmt_utc(ts: int) -> str:
+    # Events often share timestamps, so most calls are cache hits.
+    return datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
+
+
 def fmt_ts(ts: Optional[int]) -> str:
     if ts is None:
         return "None"
-    return datetime.fromtimestamp(int(ts), tz=timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
+    return _fmt_utc(int(ts))
+
+
+TS_KEYS = ("t", "ts", "time", "timestamp", "x")
+VALUE_KEYS = ("pnl", "value", "y", "p", "profit", "amount", "totalPnl")
 
 
 def ts_from_point(p: dict) -> Optional[int]:
-    for k in ("t", "ts", "time", "timestamp", "x"):
-        if k in p and p[k] is not None:
-            try:
-                return int(float(p[k]))
-            except Exception:
-                pass
+    for k in TS_KEYS:
+        v = p.get(k)
+        if v is None:
+            continue
+        try:
+            return int(float(v))
+        except Exception:
+            pass
     return None
 
 
 def val_from_point(p: dict) -> Optional[Decimal]:
-    for k in ("pnl", "value", "y", "p", "profit", "amount", "totalPnl"):
-        if k in p and p[k] is not None:
-            try:
-                return D(p[k])
-            except Exception:
-                pass
+    for k in VALUE_KEYS:
+        v = p.get(k)
+        if v is None:
+            continue
+        try:
+            return D(v)
+        except Exception:
+            pass
     return None
 
 
 def fetch_json(url: str, params=None):
-    r = requests.get(url, params=params, timeout=45)
+    r = SESSION.get(url, params=params, timeout=45)
     try:
-        data = r.json()
+        # window=all timeseries bodies are large numeric lists; orjson parses them faster.
+        data = orjson.loads(r.content)
     except Exception:
         data = None
     return r.status_code, data, r.text
 
 
-@dataclass
+def load_pnl_endpoint() -> Optional[Tuple[str, dict]]:
+    try:
+        cached = json.loads(PNL_ENDPOINT_CACHE.read_text())
+        return cached["url"], cached["params"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def save_pnl_endpoint(url: str, params: dict):
+    try:
+        PNL_ENDPOINT_CACHE.parent.mkdir(parents=True, exist_ok=True)
+        PNL_ENDPOINT_CACHE.write_text(json.dumps({"url": url, "params": params}))
+    except OSError as e:
+        print(f"Could not write endpoint cache {PNL_ENDPOINT_CACHE}: {e}")
+
+
+@dataclass(slots=True)
 class Pos:
-    shares: Decimal = Decimal("0")
-    avg_cost: Decimal = Decimal("0")
+    shares: Decimal = ZERO
+    avg_cost: Decimal = ZERO
 
     def buy(self, size: Decimal, price: Decimal):
         old_cost = self.shares * self.avg_cost
@@ -88,48 +151,155 @@ class Pos:
 
     def sell(self, size: Decimal, price: Decimal) -> Decimal:
         if self.shares <= 0:
-            return Decimal("0")
+            return ZERO
         qty = min(size, self.shares)
         pnl = qty * (price - self.avg_cost)
         self.shares -= qty
         if self.shares <= 0:
-            self.shares = Decimal("0")
-            self.avg_cost = Decimal("0")
+            self.shares = ZERO
+            self.avg_cost = ZERO
         return pnl
 
     def zero_out(self) -> Decimal:
         if self.shares <= 0:
-            return Decimal("0")
+            return ZERO
         pnl = -self.shares * self.avg_cost
-        self.shares = Decimal("0")
-        self.avg_cost = Decimal("0")
+        self.shares = ZERO
+        self.avg_cost = ZERO
         return pnl
 
 
+class PositionBook(dict):
+    """(market_id, outcome) -> Pos, with per-market keys in insertion order."""
+
+    def __init__(self):
+        super().__init__()
+        self.by_market: Dict[int, List[Tuple[int, str]]] = defaultdict(list)
+
+    def __missing__(self, key: Tuple[int, str]) -> Pos:
+        pos = self[key] = Pos()
+        self.by_market[key[0]].append(key)
+        return pos
+
+    def market_items(self, market_id: int) -> List[Tuple[Tuple[int, str], Pos]]:
+        return [(k, self[k]) for k in self.by_market.get(market_id, ())]
+
+
 def print_header(title: str):
     print("\n" + "=" * 120)
     print(title)
     print("=" * 120)
 
 
+# json.dumps(..., ensure_ascii=False) builds a new encoder on every call.
+EVENT_JSON = json.JSONEncoder(ensure_ascii=False)
+POSITION_JSON = json.JSONEncoder(ensure_ascii=False, indent=2)
+
+
+def trade_record(t) -> dict:
+    return {
+        "id": t.id,
+        "ts": int(t.timestamp),
+        "ts_utc": fmt_ts(t.timestamp),
+        "side": t.side,
+        "market_id": t.market_id,
+        "condition_id": t.market__condition_id,
+        "title": t.market__title,
+        "outcome": t.outcome,
+        "price": str(t.price),
+        "size": str(t.size),
+        "total_value": str(t.total_value),
+        "tx": t.transaction_hash,
+        "asset": t.asset,
+    }
+
+
+def activity_record(a) -> dict:
+    return {
+        "id": a.id,
+        "ts": int(a.timestamp),
+        "ts_utc": fmt_ts(a.timestamp),
+        "activity_type": a.activity_type,
+        "market_id": a.market_id,
+        "condition_id": a.market__condition_id,
+        "title": a.title or a.market__title,
+        "outcome": a.outcome,
+        "size": str(a.size),
+        "usdc_size": str(a.usdc_size),
+        "tx": a.transaction_hash,
+        "asset": a.asset,
+    }
+
+
+# Only the columns the replay and the after-cutoff listing read.
+TRADE_FIELDS = (
+    "id", "timestamp", "market_id", "outcome", "side", "price", "size", "total_value",
+    "transaction_hash", "asset", "market__condition_id", "market__title",
+)
+ACTIVITY_FIELDS = (
+    "id", "timestamp", "market_id", "activity_type", "outcome", "size", "usdc_size", "title",
+    "transaction_hash", "asset", "market__condition_id", "market__title",
+)
+
+
+# (ts, kind, id, row) events sort into replay order with no key function.
+TRADE_KIND = 0
+ACTIVITY_KIND = 1
+
+
+def event_rows(qs, fields) -> list:
+    # Named tuples keep attribute access without building model instances.
+    return list(qs.values_list(*fields, named=True).order_by("timestamp", "id").iterator(chunk_size=5000))
+
+
 def load_events(wallet: Wallet):
-    trades = list(Trade.objects.filter(wallet=wallet).select_related("market").order_by("timestamp", "id"))
-    activities = list(Activity.objects.filter(wallet=wallet).select_related("market").order_by("timestamp", "id"))
-    events = [("trade", t.timestamp, t.id, t) for t in trades] + [("activity", a.timestamp, a.id, a) for a in activities]
-    # process trades before activities at same ts so avg cost is ready for redeem
-    events.sort(key=lambda x: (x[1], 0 if x[0] == "trade" else 1, x[2]))
+    trades = event_rows(Trade.objects.filter(wallet=wallet), TRADE_FIELDS)
+    activities = event_rows(Activity.objects.filter(wallet=wallet), ACTIVITY_FIELDS)
+    events = [(t.timestamp, TRADE_KIND, t.id, t) for t in trades]
+    events.extend((a.timestamp, ACTIVITY_KIND, a.id, a) for a in activities)
+    # TRADE_KIND < ACTIVITY_KIND: trades go before activities at the same ts
+    # so avg cost is ready for redeem
+    events.sort()
     return trades, activities, events
 
 
-def replay_until(events, cutoff_ts: int):
-    positions: Dict[Tuple[int, str], Pos] = defaultdict(Pos)
-    realized = Decimal("0")
+def cutoff_index(events, cutoff_ts: int) -> int:
+    """Index of the first event at or after cutoff_ts (events are ts-sorted)."""
+    return bisect_left(events, cutoff_ts, key=itemgetter(0))
+
+
+def apply_redeem(positions: PositionBook, market_id: int, size: Decimal, usdc: Decimal) -> Decimal:
+    realized = ZERO
+    if usdc > 0:
+        # winner redeem at $1
+        candidates = [p for _, p in positions.market_items(market_id) if p.shares > 0]
+        # try exact share match first
+        for p in candidates:
+            if abs(p.shares - size) <= REDEEM_MATCH_TOL:
+                return p.sell(size, ONE)
+        rem = size
+        # candidates is already a fresh list, so sort it in place.
+        candidates.sort(key=attrgetter("shares"), reverse=True)
+        for p in candidates:
+            if rem <= 0:
+                break
+            q = min(rem, p.shares)
+            realized += p.sell(q, ONE)
+            rem -= q
+    else:
+        # loser redeem -> zero out
+        for _, p in positions.market_items(market_id):
+            if p.shares > 0:
+                realized += p.zero_out()
+    return realized
 
-    for typ, ts, _id, obj in events:
-        if ts >= cutoff_ts:
-            break
 
-        if typ == "trade":
+def replay_until(events, cutoff_ts: int):
+    positions = PositionBook()
+    realized = ZERO
+
+    for ts, kind, _id, obj in islice(events, cutoff_index(events, cutoff_ts)):
+        if kind == TRADE_KIND:
             key = (obj.market_id or -1, obj.outcome or "")
             price = D(obj.price)
             size = D(obj.size)
@@ -139,31 +309,7 @@ def replay_until(events, cutoff_ts: int):
                 realized += positions[key].sell(size, price)
         else:
             if obj.activity_type == "REDEEM" and obj.market_id:
-                size = D(obj.size)
-                usdc = D(obj.usdc_size)
-                if usdc > 0:
-                    # winner redeem at $1
-                    candidates = [(k, v) for k, v in positions.items() if k[0] == obj.market_id and v.shares > 0]
-                    # try exact share match first
-                    matched = False
-                    for k, p in candidates:
-                        if abs(p.shares - size) <= Decimal("0.000001"):
-                            realized += p.sell(size, Decimal("1"))
-                            matched = True
-                            break
-                    if not matched:
-                        rem = size
-                        for k, p in sorted(candidates, key=lambda kv: kv[1].shares, reverse=True):
-                            if rem <= 0:
-                                break
-                            q = min(rem, p.shares)
-                            realized += p.sell(q, Decimal("1"))
-                            rem -= q
-                else:
-                    # loser redeem -> zero out
-                    for k, p in list(positions.items()):
-                        if k[0] == obj.market_id and p.shares > 0:
-                            realized += p.zero_out()
+                realized += apply_redeem(positions, obj.market_id, D(obj.size), D(obj.usdc_size))
 
     return positions, realized
 
@@ -174,21 +320,43 @@ def main():
     print(f"Cutoff: {CUTOFF_DT.strftime('%Y-%m-%d %H:%M:%S UTC')}")
     print(f"Target weekly values observed: was ${TARGET_BEFORE}, now ${TARGET_NOW}, change {TARGET_DROP:+.2f}")
 
-    wallet = Wallet.objects.get(id=WALLET_ID)
-    trades, activities, events = load_events(wallet)
-
-    print_header("1) API /v1/pnl window=all timeseries + recent deltas")
     candidate_urls = [
         (f"https://data-api.polymarket.com/v1/pnl/{WALLET_ADDRESS}", {"window": "all"}),
         ("https://data-api.polymarket.com/v1/pnl", {"address": WALLET_ADDRESS, "window": "all"}),
         (f"https://data-api.polymarket.com/pnl/{WALLET_ADDRESS}", {"window": "all"}),
         ("https://data-api.polymarket.com/pnl", {"address": WALLET_ADDRESS, "window": "all"}),
     ]
+    # Candidates are always read in the priority order above. Up front, only
+    # those up to the endpoint that served points last run are requested, so a
+    # higher-priority source that has recovered still wins; lower-priority
+    # ones are submitted only if none of those returns points.
+    remembered = load_pnl_endpoint()
+    if remembered in candidate_urls:
+        upfront = candidate_urls.index(remembered) + 1
+    else:
+        remembered = None
+        upfront = len(candidate_urls)
+
+    # API requests go out up front, overlapping with each other and with
+    # the DB load; results are still read in candidate order below.
+    executor = ThreadPoolExecutor(max_workers=len(candidate_urls) + 1)
 
+    def submit_pnl(candidates):
+        return [executor.submit(fetch_json, url, params) for url, params in candidates]
+
+    pnl_futures = submit_pnl(candidate_urls[:upfront])
+    pos_future = executor.submit(fetch_json, POSITIONS_URL, {"user": WALLET_ADDRESS})
+
+    wallet = Wallet.objects.get(id=WALLET_ID)
+    trades, activities, events = load_events(wallet)
+
+    print_header("1) API /v1/pnl window=all timeseries + recent deltas")
     points: List[dict] = []
     used = None
-    for pnl_url, params in candidate_urls:
-        status, data, raw = fetch_json(pnl_url, params=params)
+    for i, (pnl_url, params) in enumerate(candidate_urls):
+        if i == len(pnl_futures):
+            pnl_futures += submit_pnl(candidate_urls[i:])
+        status, data, raw = pnl_futures[i].result()
         qs = "&".join(f"{k}={v}" for k, v in params.items())
         print(f"GET {pnl_url}?{qs} -> HTTP {status}")
 
@@ -209,9 +377,12 @@ def main():
         if status != 200:
             print(f"  body head: {raw[:180]!r}")
 
+    executor.shutdown(wait=False)
     print(f"Timeseries points parsed: {len(points)}")
     if used:
         print(f"Using timeseries source: {used[0]} params={used[1]}")
+        if used != remembered:
+            save_pnl_endpoint(*used)
     if not points:
         print("Could not parse list-like points from any candidate endpoint.")
     else:
@@ -241,8 +412,8 @@ def main():
                 print(f"  {fmt_ts(ts0)} -> {fmt_ts(ts1)} | {v0} -> {v1} | delta {dv:+.6f}")
 
             # closest points to observed values
-            by_669 = sorted(parsed, key=lambda x: abs(x[1] - TARGET_NOW))[:5]
-            by_756 = sorted(parsed, key=lambda x: abs(x[1] - TARGET_BEFORE))[:5]
+            by_669 = heapq.nsmallest(5, parsed, key=lambda x: abs(x[1] - TARGET_NOW))
+            by_756 = heapq.nsmallest(5, parsed, key=lambda x: abs(x[1] - TARGET_BEFORE))
             print("\nClosest points to 6.69:")
             for ts, v, _ in by_669:
                 print(f"  {fmt_ts(ts)} value={v} diff={(v - TARGET_NOW):+.6f}")
@@ -251,14 +422,12 @@ def main():
                 print(f"  {fmt_ts(ts)} value={v} diff={(v - TARGET_BEFORE):+.6f}")
 
             # best matching consecutive drop to -0.87
-            step_deltas = []
-            for i in range(1, len(parsed)):
-                ts0, v0, _ = parsed[i - 1]
-                ts1, v1, _ = parsed[i]
-                step_deltas.append((abs((v1 - v0) - TARGET_DROP), ts0, ts1, v0, v1, v1 - v0))
-            step_deltas.sort(key=lambda x: x[0])
+            step_deltas = heapq.nsmallest(8, (
+                (abs((v1 - v0) - TARGET_DROP), ts0, ts1, v0, v1, v1 - v0)
+                for (ts0, v0, _), (ts1, v1, _) in zip(parsed, islice(parsed, 1, None))
+            ), key=itemgetter(0))
             print("\nClosest consecutive changes to -0.87:")
-            for row in step_deltas[:8]:
+            for row in step_deltas:
                 _, ts0, ts1, v0, v1, dv = row
                 print(f"  {fmt_ts(ts0)} -> {fmt_ts(ts1)} | {v0} -> {v1} | delta {dv:+.6f}")
 
@@ -273,52 +442,32 @@ def main():
                 print(f"  delta {en_v - st_v:+.6f}")
 
     print_header("2) ALL DB events AFTER exact cutoff (>= 2026-02-09 16:00 UTC)")
-    trades_after = [t for t in trades if int(t.timestamp) >= CUTOFF_TS]
-    acts_after = [a for a in activities if int(a.timestamp) >= CUTOFF_TS]
+    # trades and activities come back ordered by timestamp (see event_rows).
+    trades_after = trades[bisect_left(trades, CUTOFF_TS, key=attrgetter("timestamp")):]
+    acts_after = activities[bisect_left(activities, CUTOFF_TS, key=attrgetter("timestamp")):]
     print(f"Trades after cutoff: {len(trades_after)}")
     print(f"Activities after cutoff: {len(acts_after)}")
 
     print("\nTRADES:")
-    for t in trades_after:
-        print(json.dumps({
-            "id": t.id,
-            "ts": int(t.timestamp),
-            "ts_utc": fmt_ts(t.timestamp),
-            "side": t.side,
-            "market_id": t.market_id,
-            "condition_id": t.market.condition_id if t.market else None,
-            "title": t.market.title if t.market else None,
-            "outcome": t.outcome,
-            "price": str(t.price),
-            "size": str(t.size),
-            "total_value": str(t.total_value),
-            "tx": t.transaction_hash,
-            "asset": t.asset,
-        }, ensure_ascii=False))
+    sys.stdout.writelines(EVENT_JSON.encode(trade_record(t)) + "\n" for t in trades_after)
 
     print("\nACTIVITIES:")
-    for a in acts_after:
-        print(json.dumps({
-            "id": a.id,
-            "ts": int(a.timestamp),
-            "ts_utc": fmt_ts(a.timestamp),
-            "activity_type": a.activity_type,
-            "market_id": a.market_id,
-            "condition_id": a.market.condition_id if a.market else None,
-            "title": a.title or (a.market.title if a.market else None),
-            "outcome": a.outcome,
-            "size": str(a.size),
-            "usdc_size": str(a.usdc_size),
-            "tx": a.transaction_hash,
-            "asset": a.asset,
-        }, ensure_ascii=False))
+    sys.stdout.writelines(EVENT_JSON.encode(activity_record(a)) + "\n" for a in acts_after)
 
     print_header("3) Weekly PnL interpretations for events after cutoff")
     # Interpretation A: simple cashflow
-    sell_cash = sum(D(t.total_value) for t in trades_after if t.side == "SELL")
-    buy_cash = sum(D(t.total_value) for t in trades_after if t.side == "BUY")
-    redeem_cash = sum(D(a.usdc_size) for a in acts_after if a.activity_type == "REDEEM")
-    reward_cash = sum(D(a.usdc_size) for a in acts_after if a.activity_type == "REWARD")
+    sell_cash = buy_cash = ZERO
+    for t in trades_after:
+        if t.side == "SELL":
+            sell_cash += t.total_value
+        elif t.side == "BUY":
+            buy_cash += t.total_value
+    redeem_cash = reward_cash = ZERO
+    for a in acts_after:
+        if a.activity_type == "REDEEM":
+            redeem_cash += a.usdc_size
+        elif a.activity_type == "REWARD":
+            reward_cash += a.usdc_size
     simple_cash = sell_cash - buy_cash + redeem_cash + reward_cash
 
     print(f"Simple cash components:")
@@ -329,29 +478,23 @@ def main():
     print(f"  SIMPLE_CASH:   {simple_cash:+.6f}")
 
     # Interpretation B: avg-cost realized (seeded with full history before cutoff)
-    pos0, realized_before = replay_until(events, CUTOFF_TS)
+    # The seeded book is carried straight into the after-cutoff replay.
+    positions, realized_before = replay_until(events, CUTOFF_TS)
     print(f"\nReplay seeded through history BEFORE cutoff: realized cumulative before cutoff={realized_before:+.6f}")
 
-    positions: Dict[Tuple[int, str], Pos] = defaultdict(Pos)
-    for k, p in pos0.items():
-        positions[k] = Pos(shares=p.shares, avg_cost=p.avg_cost)
-
-    realized_window = Decimal("0")
-    trade_realized_window = Decimal("0")
-    redeem_realized_window = Decimal("0")
+    realized_window = ZERO
+    trade_realized_window = ZERO
+    redeem_realized_window = ZERO
 
     print("\nEvent-by-event avg-cost realized AFTER cutoff:")
-    for typ, ts, _id, obj in events:
-        if ts < CUTOFF_TS:
-            continue
-
-        if typ == "trade":
+    for ts, kind, _id, obj in islice(events, cutoff_index(events, CUTOFF_TS), None):
+        if kind == TRADE_KIND:
             key = (obj.market_id or -1, obj.outcome or "")
             px = D(obj.price)
             sz = D(obj.size)
             if obj.side == "BUY":
                 positions[key].buy(sz, px)
-                realized_evt = Decimal("0")
+                realized_evt = ZERO
             else:
                 realized_evt = positions[key].sell(sz, px)
                 trade_realized_window += realized_evt
@@ -372,28 +515,7 @@ def main():
 
             size = D(obj.size)
             usdc = D(obj.usdc_size)
-            realized_evt = Decimal("0")
-
-            if usdc > 0:
-                candidates = [(k, p) for k, p in positions.items() if k[0] == obj.market_id and p.shares > 0]
-                matched = False
-                for k, p in candidates:
-                    if abs(p.shares - size) <= Decimal("0.000001"):
-                        realized_evt += p.sell(size, Decimal("1"))
-                        matched = True
-                        break
-                if not matched:
-                    rem = size
-                    for k, p in sorted(candidates, key=lambda kv: kv[1].shares, reverse=True):
-                        if rem <= 0:
-                            break
-                        q = min(rem, p.shares)
-                        realized_evt += p.sell(q, Decimal("1"))
-                        rem -= q
-            else:
-                for k, p in list(positions.items()):
-                    if k[0] == obj.market_id and p.shares > 0:
-                        realized_evt += p.zero_out()
+            realized_evt = apply_redeem(positions, obj.market_id, size, usdc)
 
             redeem_realized_window += realized_evt
             realized_window += realized_evt
@@ -413,27 +535,25 @@ def main():
     print(f"  realized_win - 7.56 = {(realized_window - TARGET_BEFORE):+.6f}")
 
     print_header("5) Positions API and open-position live valuation")
-    pos_url = "https://data-api.polymarket.com/v1/positions"
-    st, pos_data, pos_raw = fetch_json(pos_url, params={"user": WALLET_ADDRESS})
-    print(f"GET {pos_url}?user=... -> HTTP {st}")
+    st, pos_data, pos_raw = pos_future.result()
+    print(f"GET {POSITIONS_URL}?user=... -> HTTP {st}")
 
     rows = pos_data if isinstance(pos_data, list) else []
     print(f"Rows: {len(rows)}")
     if not rows:
         print(pos_raw[:1500])
     else:
-        # print everything
+        sum_current = ZERO
+        sum_initial = ZERO
+        sum_cash_pnl = ZERO
+        sum_realized = ZERO
+        sum_unrealized = ZERO
+
+        # print everything, accumulating the aggregates in the same pass
         for i, r in enumerate(rows, 1):
             print(f"\nPosition #{i}")
-            print(json.dumps(r, ensure_ascii=False, indent=2))
-
-        sum_current = Decimal("0")
-        sum_initial = Decimal("0")
-        sum_cash_pnl = Decimal("0")
-        sum_realized = Decimal("0")
-        sum_unrealized = Decimal("0")
+            print(POSITION_JSON.encode(r))
 
-        for r in rows:
             cur = D(r.get("currentValue"))
             init = D(r.get("initialValue"))
             cash = D(r.get("cashPnl"))
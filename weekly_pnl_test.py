@@ -13,12 +13,18 @@ Task goals:
 4) Compare against Polymarket weekly reference values.
 """
 
+import heapq
 import json
 import os
+from bisect import bisect_right
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta, timezone
 from decimal import Decimal
+from functools import lru_cache
+from itertools import accumulate
+from operator import itemgetter
 from typing import Dict, Iterable, List, Optional, Set, Tuple
 
 import django
@@ -35,7 +41,7 @@ except ModuleNotFoundError as exc:
     else:
         raise
 
-from wallet_analysis.models import Activity, Trade, Wallet  # noqa: E402
+from wallet_analysis.models import Activity, Market, Trade, Wallet  # noqa: E402
 
 
 WALLET_ID = 7
@@ -45,20 +51,37 @@ WALLET_ADDRESS = "0xbdcd1a99e6880b8146f61323dcb799bb5b243e9c"
 ASOF_END_DT = datetime(2026, 2, 16, 23, 59, 59, tzinfo=timezone.utc)
 WINDOW_DAYS = [7, 8, 9, 10]
 
+END_TS = int(ASOF_END_DT.timestamp())
+# Inclusive day window, e.g. 7D => Feb10 00:00:00 .. Feb16 23:59:59
+WINDOW_STARTS = [
+    int((ASOF_END_DT - timedelta(days=days - 1)).replace(hour=0, minute=0, second=0).timestamp())
+    for days in WINDOW_DAYS
+]
+
 # Optional profile reference from manual web UI check (1W tab on profile page).
 # Set to None if you want to disable comparison.
 PROFILE_WEEKLY_REFERENCE = Decimal("7.56")
 
+# Shared connection pool for the data-api calls in fetch_weekly_refs.
+SESSION = requests.Session()
+SESSION.headers.update({"Accept": "application/json", "User-Agent": "PolymarketWalletAnalyzer/1.0"})
+
 EPS = Decimal("0.000001")
 ONE = Decimal("1")
 ZERO = Decimal("0")
 
 
 def D(x) -> Decimal:
+    # DecimalField values are already Decimal; skip the str() round-trip.
+    if isinstance(x, Decimal):
+        return x
+    # int and str convert exactly as-is; only floats need their repr.
+    if type(x) is int or type(x) is str:
+        return Decimal(x)
     return Decimal(str(x))
 
 
-@dataclass
+@dataclass(slots=True)
 class Pos:
     shares: Decimal = ZERO
     avg_cost: Decimal = ZERO
@@ -90,9 +113,25 @@ class Pos:
         return pnl
 
 
-@dataclass
+class PositionBook(dict):
+    """(market_id, outcome) -> Pos, with per-market keys in insertion order."""
+
+    def __init__(self):
+        super().__init__()
+        self.by_market: Dict[int, List[Tuple[int, str]]] = defaultdict(list)
+
+    def __missing__(self, key: Tuple[int, str]) -> Pos:
+        pos = self[key] = Pos()
+        self.by_market[key[0]].append(key)
+        return pos
+
+    def market_items(self, market_id: int) -> List[Tuple[Tuple[int, str], Pos]]:
+        return [(k, self[k]) for k in self.by_market.get(market_id, ())]
+
+
+@dataclass(slots=True)
 class ReplayState:
-    positions: Dict[Tuple[int, str], Pos] = field(default_factory=lambda: defaultdict(Pos))
+    positions: PositionBook = field(default_factory=PositionBook)
     market_outcomes: Dict[int, Set[str]] = field(default_factory=lambda: defaultdict(set))
     market_resolution: Dict[int, Tuple[int, str]] = field(default_factory=dict)
     last_trade_price: Dict[Tuple[int, str], Decimal] = field(default_factory=dict)
@@ -101,21 +140,20 @@ class ReplayState:
     rewards_total: Decimal = ZERO
 
 
-@dataclass
-class EventDelta:
-    ts: int
-    realized: Decimal = ZERO
-    rewards: Decimal = ZERO
 
+# Event kinds, as in weekly_pnl_deep/weekly_pnl_final: small ints instead of
+# "trade"/"activity" strings for the per-event dispatch.
+TRADE_KIND = 0
+ACTIVITY_KIND = 1
 
 
-def make_sort_key(event_type: str, obj):
+def make_sort_key(kind: int, obj):
     """Winner redeems before loser redeems at same timestamp, trades first."""
-    if event_type == "trade":
+    if kind == TRADE_KIND:
         return (obj.timestamp, 0, obj.id)
 
     if obj.activity_type == "REDEEM":
-        if D(obj.usdc_size) > 0:
+        if obj.usdc_size > 0:
             return (obj.timestamp, 1, obj.id)  # winner first
         return (obj.timestamp, 3, obj.id)      # loser last
 
@@ -125,36 +163,59 @@ def make_sort_key(event_type: str, obj):
     return (obj.timestamp, 2, obj.id)
 
 
+# Only the columns apply_event and preload_market_data read; market
+# resolutions come from one Market query in preload_market_data.
+TRADE_FIELDS = ("id", "timestamp", "market_id", "outcome", "side", "price", "size")
+ACTIVITY_FIELDS = ("id", "timestamp", "market_id", "activity_type", "size", "usdc_size")
+
+
+def event_rows(qs, fields) -> list:
+    # Named tuples keep attribute access without building model instances.
+    # iterator() skips the queryset result cache; the rows themselves are
+    # kept because preload and both replays walk them.
+    return list(qs.values_list(*fields, named=True).order_by("timestamp", "id").iterator(chunk_size=2000))
+
+
 def collect_events():
     wallet = Wallet.objects.get(id=WALLET_ID)
-    trades = list(Trade.objects.filter(wallet=wallet).select_related("market").order_by("timestamp", "id"))
-    activities = list(Activity.objects.filter(wallet=wallet).select_related("market").order_by("timestamp", "id"))
-
-    events = [("trade", t) for t in trades] + [("activity", a) for a in activities]
-    events.sort(key=lambda x: make_sort_key(x[0], x[1]))
+    trades = event_rows(Trade.objects.filter(wallet=wallet), TRADE_FIELDS)
+    activities = event_rows(Activity.objects.filter(wallet=wallet), ACTIVITY_FIELDS)
+
+    # Trades already come back in make_sort_key order ((ts, 0, id)), so only
+    # activities are sorted; heapq.merge is stable, so same-key trades still
+    # precede activities.
+    trade_events = ((make_sort_key(TRADE_KIND, t), TRADE_KIND, t) for t in trades)
+    activity_events = sorted(
+        ((make_sort_key(ACTIVITY_KIND, a), ACTIVITY_KIND, a) for a in activities), key=itemgetter(0)
+    )
+    events = [(kind, obj) for _, kind, obj in heapq.merge(trade_events, activity_events, key=itemgetter(0))]
     return trades, activities, events
 
 
-def preload_market_data(state: ReplayState, trades: Iterable[Trade], activities: Iterable[Activity]):
+def preload_market_data(state: ReplayState, trades: Iterable, activities: Iterable):
     for t in trades:
         if t.market_id:
             state.market_outcomes[t.market_id].add(t.outcome)
-            if t.market and t.market.resolved and t.market.resolution_timestamp:
-                state.market_resolution[t.market_id] = (int(t.market.resolution_timestamp), t.market.winning_outcome)
-
-    for a in activities:
-        if a.market and a.market_id and a.market.resolved and a.market.resolution_timestamp:
-            state.market_resolution[a.market_id] = (int(a.market.resolution_timestamp), a.market.winning_outcome)
 
+    # One row per distinct market instead of a joined Market on every event.
+    market_ids = set(state.market_outcomes)
+    market_ids.update(a.market_id for a in activities if a.market_id)
+    resolved = (
+        Market.objects.filter(id__in=market_ids, resolved=True)
+        .exclude(resolution_timestamp__isnull=True)
+        .exclude(resolution_timestamp=0)
+        .values_list("id", "resolution_timestamp", "winning_outcome")
+    )
+    for market_id, resolution_ts, winning_outcome in resolved:
+        state.market_resolution[market_id] = (resolution_ts, winning_outcome)
 
-def apply_event(state: ReplayState, event_type: str, obj) -> EventDelta:
-    ts = int(obj.timestamp)
-    delta = EventDelta(ts=ts)
 
-    if event_type == "trade":
+def apply_event(state: ReplayState, kind: int, obj) -> Decimal:
+    """Apply one event to state; returns its realized+rewards change (ZERO for no-ops)."""
+    if kind == TRADE_KIND:
         t = obj
         if not t.market_id:
-            return delta
+            return ZERO
 
         key = (t.market_id, t.outcome)
         state.market_outcomes[t.market_id].add(t.outcome)
@@ -165,28 +226,31 @@ def apply_event(state: ReplayState, event_type: str, obj) -> EventDelta:
 
         pos = state.positions[key]
         if t.side == "BUY":
-            delta.realized += pos.buy(size, price)
+            realized = pos.buy(size, price)
         else:
-            delta.realized += pos.sell(size, price)
+            realized = pos.sell(size, price)
 
-        state.realized_total += delta.realized
-        return delta
+        state.realized_total += realized
+        return realized
 
     a = obj
     if a.activity_type == "REWARD":
-        delta.rewards += D(a.usdc_size)
-        state.rewards_total += delta.rewards
-        return delta
+        rewards = D(a.usdc_size)
+        state.rewards_total += rewards
+        return rewards
 
     if not a.market_id:
-        return delta
+        return ZERO
 
     size = D(a.size)
     usdc = D(a.usdc_size)
 
     # trades-only position creation: ignore SPLIT/CONVERSION additions
     if a.activity_type in ("SPLIT", "CONVERSION"):
-        return delta
+        return ZERO
+
+    realized = ZERO
+    positions = state.positions
 
     if a.activity_type == "MERGE":
         outcomes = state.market_outcomes.get(a.market_id, {"Yes", "No"})
@@ -194,18 +258,17 @@ def apply_event(state: ReplayState, event_type: str, obj) -> EventDelta:
         if size > 0 and n > 0:
             rev_per_share = usdc / (size * n)
             for outcome in outcomes:
-                key = (a.market_id, outcome)
-                pos = state.positions[key]
+                pos = positions[(a.market_id, outcome)]
                 if pos.shares > EPS:
-                    delta.realized += pos.sell(min(size, pos.shares), rev_per_share)
+                    realized += pos.sell(min(size, pos.shares), rev_per_share)
 
     elif a.activity_type == "REDEEM":
         if usdc > 0:
-            market_pos = [(k, v) for k, v in state.positions.items() if k[0] == a.market_id and v.shares > EPS]
+            market_pos = [(k, v) for k, v in positions.market_items(a.market_id) if v.shares > EPS]
             matched = False
             for key, pos in market_pos:
                 if abs(pos.shares - size) < Decimal("0.5"):
-                    delta.realized += pos.sell(size, ONE)
+                    realized += pos.sell(size, ONE)
                     matched = True
                     break
             if not matched:
@@ -214,73 +277,110 @@ def apply_event(state: ReplayState, event_type: str, obj) -> EventDelta:
                     if remaining <= EPS:
                         break
                     qty = min(remaining, pos.shares)
-                    delta.realized += pos.sell(qty, ONE)
+                    realized += pos.sell(qty, ONE)
                     remaining -= qty
         else:
-            for key, pos in list(state.positions.items()):
-                if key[0] == a.market_id and pos.shares > EPS:
-                    delta.realized += pos.zero_out()
+            for key, pos in positions.market_items(a.market_id):
+                if pos.shares > EPS:
+                    realized += pos.zero_out()
 
-    state.realized_total += delta.realized
-    return delta
+    state.realized_total += realized
+    return realized
 
 
 def calc_unrealized(state: ReplayState, asof_ts: int, mtm: bool = True) -> Decimal:
+    positions = state.positions
+    last_trade_price = state.last_trade_price
     unrealized = ZERO
-    for (market_id, outcome), pos in state.positions.items():
-        if pos.shares <= EPS:
-            continue
-
-        mark: Optional[Decimal] = None
+    # Walk positions market by market so each market's resolution is looked
+    # up once per cutoff rather than once per outcome.
+    for market_id, keys in positions.by_market.items():
+        settled = False
+        winner: Optional[str] = None
         if mtm:
             resolved = state.market_resolution.get(market_id)
             if resolved and asof_ts >= resolved[0]:
-                mark = ONE if outcome == resolved[1] else ZERO
-            else:
-                mark = state.last_trade_price.get((market_id, outcome))
+                settled, winner = True, resolved[1]
+
+        for key in keys:
+            pos = positions[key]
+            if pos.shares <= EPS:
+                continue
 
-        if mark is None:
-            mark = pos.avg_cost
+            mark: Optional[Decimal] = None
+            if settled:
+                mark = ONE if key[1] == winner else ZERO
+            elif mtm:
+                mark = last_trade_price.get(key)
 
-        unrealized += pos.shares * (mark - pos.avg_cost)
+            if mark is None:
+                mark = pos.avg_cost
+
+            unrealized += pos.shares * (mark - pos.avg_cost)
 
     return unrealized
 
 
-def replay_all() -> Tuple[ReplayState, List[EventDelta]]:
-    trades, activities, events = collect_events()
+def replay_all(trades, activities, events) -> Tuple[ReplayState, List[Tuple[int, Decimal]]]:
+    """
+    Replay every event, returning (ts, realized+rewards change) pairs.
+
+    Events that change neither (buys, splits, rows without a market) are
+    left out; they contribute nothing to any cutoff sum.
+    """
     state = ReplayState()
     preload_market_data(state, trades, activities)
 
-    deltas: List[EventDelta] = []
-    for etype, obj in events:
-        d = apply_event(state, etype, obj)
-        deltas.append(d)
+    deltas: List[Tuple[int, Decimal]] = []
+    append = deltas.append
+    for kind, obj in events:
+        amount = apply_event(state, kind, obj)
+        if amount:
+            append((obj.timestamp, amount))
 
     return state, deltas
 
 
-def cumulative_realized_rewards_at(deltas: List[EventDelta], cutoff_ts: int) -> Decimal:
-    total = ZERO
-    for d in deltas:
-        if d.ts <= cutoff_ts:
-            total += d.realized + d.rewards
-        else:
-            break
-    return total
+def realized_rewards_prefix(deltas: List[Tuple[int, Decimal]]) -> Tuple[List[int], List[Decimal]]:
+    """
+    Event timestamps and running realized+rewards totals for ts-sorted deltas.
 
+    cum[i] is the total over the first i deltas, so each cutoff lookup is a
+    bisect instead of a walk over every event.
+    """
+    timestamps = [ts for ts, _ in deltas]
+    cum = list(accumulate((amount for _, amount in deltas), initial=ZERO))
+    return timestamps, cum
 
-def replay_to_timestamp(end_ts: int) -> ReplayState:
-    trades, activities, events = collect_events()
+
+def cumulative_realized_rewards_at(prefix: Tuple[List[int], List[Decimal]], cutoff_ts: int) -> Decimal:
+    timestamps, cum = prefix
+    return cum[bisect_right(timestamps, cutoff_ts)]
+
+
+def total_pnl_at(cutoffs: Iterable[int], trades, activities, events) -> Dict[int, Decimal]:
+    """
+    total_pnl (realized + rewards + MTM unrealized) as of each cutoff.
+
+    One replay walks the events once and takes each total as it passes the
+    cutoff, instead of replaying from scratch for every cutoff.
+    """
     state = ReplayState()
     preload_market_data(state, trades, activities)
 
-    for etype, obj in events:
-        if int(obj.timestamp) > end_ts:
-            break
-        apply_event(state, etype, obj)
+    totals: Dict[int, Decimal] = {}
+    i, n = 0, len(events)
+    for cutoff in sorted(set(cutoffs)):
+        # events are sorted by timestamp first (see make_sort_key).
+        while i < n:
+            kind, obj = events[i]
+            if obj.timestamp > cutoff:
+                break
+            apply_event(state, kind, obj)
+            i += 1
+        totals[cutoff] = state.realized_total + state.rewards_total + calc_unrealized(state, cutoff, mtm=True)
 
-    return state
+    return totals
 
 
 def fetch_weekly_refs() -> Dict[str, Optional[Decimal]]:
@@ -292,12 +392,17 @@ def fetch_weekly_refs() -> Dict[str, Optional[Decimal]]:
     lb_url = f"https://data-api.polymarket.com/v1/leaderboard?timePeriod=week&user={WALLET_ADDRESS}"
     pnl_url = f"https://data-api.polymarket.com/v1/pnl/{WALLET_ADDRESS}?window=week"
 
+    # Both requests are in flight together; parsing and printing below stay sequential.
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        lb_future = executor.submit(SESSION.get, lb_url, timeout=30)
+        pnl_future = executor.submit(SESSION.get, pnl_url, timeout=30)
+
     print("=" * 110)
     print("STEP A: POLYMARKET WEEKLY API CHECKS")
     print("=" * 110)
 
     try:
-        r = requests.get(lb_url, timeout=30)
+        r = lb_future.result()
         print(f"Leaderboard URL: {lb_url}")
         print(f"HTTP {r.status_code}")
         payload = r.json()
@@ -311,7 +416,7 @@ def fetch_weekly_refs() -> Dict[str, Optional[Decimal]]:
     print("-" * 110)
 
     try:
-        r = requests.get(pnl_url, timeout=30)
+        r = pnl_future.result()
         print(f"PnL timeseries URL: {pnl_url}")
         print(f"HTTP {r.status_code}")
         try:
@@ -345,6 +450,7 @@ def fetch_weekly_refs() -> Dict[str, Optional[Decimal]]:
     return refs
 
 
+@lru_cache(maxsize=512)
 def fmt_dt(ts: int) -> str:
     return datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
 
@@ -356,11 +462,13 @@ def main():
     print("STEP B: AVG-COST WEEKLY WINDOW TESTS (7/8/9/10 days back from 2026-02-16)")
     print("=" * 110)
 
-    # One full replay to obtain event-level realized/reward deltas.
-    _, all_deltas = replay_all()
+    # Events are loaded once and shared by both replays below.
+    trades, activities, events = collect_events()
 
-    # Sort just in case (collect_events already sorted).
-    all_deltas.sort(key=lambda x: x.ts)
+    # One full replay to obtain event-level realized/reward deltas; they come
+    # out in event order, which collect_events sorts by timestamp first.
+    _, all_deltas = replay_all(trades, activities, events)
+    prefix = realized_rewards_prefix(all_deltas)
 
     lb = refs.get("leaderboard_week")
     profile_ref = PROFILE_WEEKLY_REFERENCE
@@ -377,28 +485,19 @@ def main():
     print(header)
     print("-" * len(header))
 
-    end_ts = int(ASOF_END_DT.timestamp())
-
-    for days in WINDOW_DAYS:
-        # Inclusive day window, e.g. 7D => Feb10 00:00:00 .. Feb16 23:59:59
-        start_dt = (ASOF_END_DT - timedelta(days=days - 1)).replace(hour=0, minute=0, second=0)
-        start_ts = int(start_dt.timestamp())
+    totals = total_pnl_at([start_ts - 1 for start_ts in WINDOW_STARTS] + [END_TS], trades, activities, events)
+    end_cum = cumulative_realized_rewards_at(prefix, END_TS)
 
+    for days, start_ts in zip(WINDOW_DAYS, WINDOW_STARTS):
         # Method 1: realized in window (incl rewards)
-        start_cum = cumulative_realized_rewards_at(all_deltas, start_ts - 1)
-        end_cum = cumulative_realized_rewards_at(all_deltas, end_ts)
+        start_cum = cumulative_realized_rewards_at(prefix, start_ts - 1)
         realized_sum = end_cum - start_cum
 
         # Method 2: snapshot diff of total_pnl = realized+rewards+unrealized(MTM)
-        start_state = replay_to_timestamp(start_ts - 1)
-        end_state = replay_to_timestamp(end_ts)
-
-        start_total = (start_state.realized_total + start_state.rewards_total + calc_unrealized(start_state, start_ts - 1, mtm=True))
-        end_total = (end_state.realized_total + end_state.rewards_total + calc_unrealized(end_state, end_ts, mtm=True))
-        snap_diff = end_total - start_total
+        snap_diff = totals[END_TS] - totals[start_ts - 1]
 
         row = (
-            f"{days:>4}  {fmt_dt(start_ts):<20}  {fmt_dt(end_ts):<20}  "
+            f"{days:>4}  {fmt_dt(start_ts):<20}  {fmt_dt(END_TS):<20}  "
             f"${realized_sum:>11,.2f}  ${snap_diff:>14,.2f}"
         )
         if lb is not None: